@@ -0,0 +1,71 @@
+## Tiempo en el aire de una trama y planificación de una pasada ##
+# Bits en el aire de un paquete del SI4432 con packet handler:
+#   preámbulo (REG_PREAMBLE_LENGTH, en nibbles)
+#   + sync word (synclen de REG_HEADER_CONTROL2)
+#   + header (hdlen de REG_HEADER_CONTROL2)
+#   + campo de largo (si fixpklen = 0)
+#   + datos (la trama ya codificada: HDLC con bit stuffing, G3RUH u offload)
+#   + CRC-16 del packet handler
+# Sin packet handler solo se envían preámbulo, sync word y datos.
+# Con Manchester cada bit ocupa dos símbolos.
+
+CRC_BYTES = 2
+TX_GAP_US = 1500  # Cambio a TX, escritura de la FIFO y espera de INT_PKSENT por trama
+
+
+def packet_bits(radio, data_length):
+    """Cantidad de bits en el aire para data_length bytes de datos."""
+    header_control2 = radio.header_control2
+    preamble_nibbles = radio.preamble_length | ((header_control2 & 0x01) << 8)
+    sync_bytes = ((header_control2 >> 1) & 0x03) + 1
+
+    data_bytes = sync_bytes + data_length
+    if radio.packet_handling_enabled:
+        data_bytes += (header_control2 >> 4) & 0x07  # Bytes de header
+        if not header_control2 & 0x08:
+            data_bytes += 1  # Campo de largo
+        data_bytes += CRC_BYTES
+
+    bits = preamble_nibbles * 4 + data_bytes * 8
+    if radio.manchester_enabled:
+        bits *= 2
+    return bits
+
+
+def frame_airtime_us(radio, data_length):
+    """Tiempo en el aire, en microsegundos, de un paquete con data_length bytes de datos."""
+    return packet_bits(radio, data_length) * 1000 / radio.kbps
+
+
+def plan_pass(radio, pass_s, encoded_length, backlog=None, gap_us=TX_GAP_US, max_tickets_per_frame=8):
+    """Elige cuántos tickets poner por trama y cuántas tramas enviar en una pasada.
+
+    encoded_length(k) devuelve el largo en bytes en el aire de una trama con k
+    tickets. Se maximizan los tickets entregados; ante un empate se prefieren
+    tramas más cortas (una trama perdida pierde menos tickets).
+    Devuelve un dict con tickets_per_frame, batch_size (tramas), tickets y
+    frame_airtime_us, o None si ninguna trama entra en la FIFO (radio.FIFO_SIZE).
+    """
+    best = None
+    pass_us = pass_s * 1000000
+    for tickets_per_frame in range(1, max_tickets_per_frame + 1):
+        length = encoded_length(tickets_per_frame)
+        if length > radio.FIFO_SIZE:
+            break
+
+        airtime_us = frame_airtime_us(radio, length)
+        frames = int(pass_us // (airtime_us + gap_us))
+        if backlog is not None:
+            frames = min(frames, -(-backlog // tickets_per_frame))
+        tickets = frames * tickets_per_frame
+        if backlog is not None:
+            tickets = min(tickets, backlog)
+
+        if best is None or tickets > best['tickets']:
+            best = {
+                'tickets_per_frame': tickets_per_frame,
+                'batch_size': frames,
+                'tickets': tickets,
+                'frame_airtime_us': airtime_us,
+            }
+    return best
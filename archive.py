@@ -0,0 +1,244 @@
+## Archivo indexado de tickets decodificados (estación terrena) ##
+# Los tickets se guardan por columnas en chunks de CHUNK_ROWS filas:
+#   chunk_NNNNNN.col - timestamp (I), user (H), place (B), sensor_id (B), ticket (16s)
+#                      cada columna ocupa CHUNK_ROWS elementos, una detrás de otra
+#   index.bin        - un registro por chunk con la cantidad de filas y el
+#                      min/max de timestamp, user, place y sensor_id
+#
+# Las consultas leen solo el índice, descartan los chunks cuyo rango no coincide
+# y recorren con mmap las columnas de los chunks restantes.
+# El archivo de cada chunk se reserva completo al crearlo; flush() escribe solo
+# las filas nuevas en el lugar de cada columna y después la entrada del índice,
+# así una fila está en disco antes de que el índice la cuente.
+# Las columnas usan el orden de bytes del host (array/memoryview nativos).
+# Solo para el host (CPython): usa os, mmap y array.
+
+import os
+import mmap
+import struct
+import time
+from array import array
+
+CHUNK_ROWS = 4096
+TICKET_SIZE = 16
+
+# Columnas: (nombre, typecode, tamaño)
+COLUMNS = (
+    ('timestamp', 'I', 4),
+    ('user', 'H', 2),
+    ('place', 'B', 1),
+    ('sensor_id', 'B', 1),
+)
+INDEXED = ('timestamp', 'user', 'place', 'sensor_id')
+
+INDEX_FORMAT = '<II' + 'II' + 'HH' + 'BB' + 'BB'  # chunk, rows, min/max por columna
+INDEX_SIZE = struct.calcsize(INDEX_FORMAT)
+
+
+def _column_offsets(rows):
+    offsets = {}
+    offset = 0
+    for name, _, size in COLUMNS:
+        offsets[name] = offset
+        offset += size * rows
+    offsets['ticket'] = offset
+    return offsets
+
+
+OFFSETS = _column_offsets(CHUNK_ROWS)
+CHUNK_SIZE = OFFSETS['ticket'] + TICKET_SIZE * CHUNK_ROWS
+
+
+def ticket_fields(ticket):
+    """Devuelve (user, place, sensor_id) de los bytes de un ticket."""
+    return (ticket[0] << 8) | ticket[1], ticket[2], ticket[3]
+
+
+def _as_range(value):
+    # Un entero es una igualdad; una tupla (desde, hasta) es un rango inclusivo
+    if isinstance(value, tuple):
+        return value
+    return value, value
+
+
+class _Chunk:
+    def __init__(self, number, rows=0, bounds=None):
+        self.number = number
+        self.rows = rows
+        self.bounds = bounds or {}  # nombre -> (min, max)
+
+    def matches(self, ranges):
+        if self.rows == 0:
+            return False
+        for name, (low, high) in ranges.items():
+            minimum, maximum = self.bounds[name]
+            if high < minimum or low > maximum:
+                return False
+        return True
+
+    def update_bounds(self, values):
+        for name, value in zip(INDEXED, values):
+            if name in self.bounds:
+                minimum, maximum = self.bounds[name]
+                self.bounds[name] = (min(minimum, value), max(maximum, value))
+            else:
+                self.bounds[name] = (value, value)
+
+    def pack(self):
+        values = []
+        for name in INDEXED:
+            values.extend(self.bounds.get(name, (0, 0)))
+        return struct.pack(INDEX_FORMAT, self.number, self.rows, *values)
+
+    @classmethod
+    def unpack(cls, data):
+        fields = struct.unpack(INDEX_FORMAT, data)
+        bounds = {}
+        for i, name in enumerate(INDEXED):
+            bounds[name] = (fields[2 + 2 * i], fields[3 + 2 * i])
+        return cls(fields[0], fields[1], bounds)
+
+
+class TicketArchive:
+    """Archivo por columnas de tickets recibidos con índices min/max por chunk."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.chunks = []
+        index_path = os.path.join(path, 'index.bin')
+        if os.path.exists(index_path):
+            with open(index_path, 'rb') as index:
+                data = index.read()
+            for offset in range(0, len(data) - INDEX_SIZE + 1, INDEX_SIZE):
+                self.chunks.append(_Chunk.unpack(data[offset:offset + INDEX_SIZE]))
+        self.index = open(index_path, 'r+b' if os.path.exists(index_path) else 'w+b')
+
+        # El último chunk incompleto vuelve a memoria para seguir agregando filas
+        if self.chunks and self.chunks[-1].rows < CHUNK_ROWS:
+            self.active = self.chunks[-1]
+            self.columns = self._load_columns(self.active)
+            self.flushed = self.active.rows  # Filas del chunk activo ya escritas
+            self.chunk_file = open(self._chunk_path(self.active.number), 'r+b')
+        else:
+            self._new_chunk()
+
+    def _chunk_path(self, number):
+        return os.path.join(self.path, 'chunk_{:06d}.col'.format(number))
+
+    def _new_chunk(self):
+        self.active = _Chunk(len(self.chunks))
+        self.chunks.append(self.active)
+        self.columns = {name: array(typecode) for name, typecode, _ in COLUMNS}
+        self.columns['ticket'] = bytearray()
+        self.flushed = 0
+        self.chunk_file = open(self._chunk_path(self.active.number), 'w+b')
+        self.chunk_file.truncate(CHUNK_SIZE)
+
+    def _load_columns(self, chunk):
+        columns = {}
+        with open(self._chunk_path(chunk.number), 'rb') as f:
+            data = f.read()
+        for name, typecode, size in COLUMNS:
+            columns[name] = array(typecode, data[OFFSETS[name]:OFFSETS[name] + size * chunk.rows])
+        columns['ticket'] = bytearray(data[OFFSETS['ticket']:OFFSETS['ticket'] + TICKET_SIZE * chunk.rows])
+        return columns
+
+    def __len__(self):
+        return sum(chunk.rows for chunk in self.chunks)
+
+    def append(self, ticket, timestamp=None):
+        """Agrega un ticket de 16 bytes con su hora de recepción (segundos UNIX)."""
+        if len(ticket) != TICKET_SIZE:
+            raise ValueError("Ticket must be 16 bytes")
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        values = (timestamp,) + ticket_fields(ticket)
+        for (name, _, _), value in zip(COLUMNS, values):
+            self.columns[name].append(value)
+        self.columns['ticket'] += ticket
+        self.active.rows += 1
+        self.active.update_bounds(values)
+
+        if self.active.rows == CHUNK_ROWS:
+            self.flush()
+            self.chunk_file.close()
+            self._new_chunk()
+
+    def extend(self, tickets, timestamp=None):
+        """Agrega un bloque de tickets, por ejemplo al reproducir una pasada completa."""
+        if timestamp is None:
+            timestamp = int(time.time())
+        for ticket in tickets:
+            self.append(ticket, timestamp)
+        self.flush()
+
+    def flush(self):
+        """Escribe las filas nuevas del chunk activo y actualiza su entrada del índice."""
+        chunk = self.active
+        start = self.flushed
+        if chunk.rows == start:
+            return
+        f = self.chunk_file
+        for name, _, size in COLUMNS:
+            f.seek(OFFSETS[name] + size * start)
+            f.write(self.columns[name][start:].tobytes())
+        f.seek(OFFSETS['ticket'] + TICKET_SIZE * start)
+        f.write(self.columns['ticket'][TICKET_SIZE * start:])
+        f.flush()
+        self.flushed = chunk.rows
+
+        self.index.seek(chunk.number * INDEX_SIZE)
+        self.index.write(chunk.pack())
+        self.index.flush()
+
+    def query(self, user=None, place=None, sensor_id=None, timestamp=None):
+        """Devuelve [(timestamp, ticket)] que cumplen todas las condiciones.
+
+        Cada condición es un entero (igualdad) o una tupla (desde, hasta) inclusiva.
+        """
+        ranges = {}
+        for name, value in (('user', user), ('place', place), ('sensor_id', sensor_id), ('timestamp', timestamp)):
+            if value is not None:
+                ranges[name] = _as_range(value)
+
+        results = []
+        for chunk in self.chunks:
+            if not chunk.matches(ranges):
+                continue
+            if chunk is self.active:
+                self._scan(self.columns, chunk.rows, ranges, results)
+                continue
+            with open(self._chunk_path(chunk.number), 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    columns = {}
+                    for name, typecode, size in COLUMNS:
+                        columns[name] = view[OFFSETS[name]:OFFSETS[name] + size * chunk.rows].cast(typecode)
+                    columns['ticket'] = view[OFFSETS['ticket']:OFFSETS['ticket'] + TICKET_SIZE * chunk.rows]
+                    self._scan(columns, chunk.rows, ranges, results)
+                    for column in columns.values():
+                        column.release()
+                    view.release()
+        return results
+
+    def _scan(self, columns, rows, ranges, results):
+        rows_left = range(rows)
+        for name, (low, high) in ranges.items():
+            column = columns[name]
+            if low == high:
+                rows_left = [i for i in rows_left if column[i] == low]
+            else:
+                rows_left = [i for i in rows_left if low <= column[i] <= high]
+            if not rows_left:
+                return
+        timestamps = columns['timestamp']
+        tickets = columns['ticket']
+        for i in rows_left:
+            results.append((timestamps[i], bytes(tickets[i * TICKET_SIZE:(i + 1) * TICKET_SIZE])))
+
+    def close(self):
+        self.flush()
+        self.chunk_file.close()
+        self.index.close()
@@ -31,7 +31,9 @@ class AX25:
         return crc & 0xFFFF
 
     class AX25Struct:
-        def __init__(self, src, src_ssid, dst, dst_ssid, control, pid, payload, cmd_msg):
+        MAX_DIGIPEATERS = 8
+
+        def __init__(self, src, src_ssid, dst, dst_ssid, control, pid, payload, cmd_msg, digipeaters=None):
             self.cmd_msg = cmd_msg
             self.src = src
             self.src_ssid = src_ssid
@@ -40,12 +42,14 @@ class AX25:
             self.control = control
             self.pid = pid
             self.payload = payload
+            # Digipeater path: list of [callsign, ssid, has_been_repeated]
+            self.digipeaters = digipeaters if digipeaters is not None else []
 
         def encode(self):
             frame = []
 
-            # Add Destination Address
-            for char in self.dst:
+            # Add Destination Address (callsign padded to 6 characters)
+            for char in self._pad_callsign(self.dst):
                 frame.append((ord(char) & 0xFF) << 1)
             # Add Destination SSID
             frame.append(0x60 + ((self.dst_ssid & 0x0F) << 1))
@@ -54,8 +58,8 @@ class AX25:
             if self.cmd_msg:
                 frame[6] += 0x80
 
-            # Add Source Address
-            for char in self.src:
+            # Add Source Address (callsign padded to 6 characters)
+            for char in self._pad_callsign(self.src):
                 frame.append((ord(char) & 0xFF) << 1)
             # Add Source SSID
             frame.append(0x60 + ((self.src_ssid & 0x0F) << 1))
@@ -64,8 +68,14 @@ class AX25:
             if not self.cmd_msg:
                 frame[13] += 0x80
 
+            # Add Digipeater Addresses (H bit set once the frame has been repeated)
+            for callsign, ssid, repeated in self.digipeaters:
+                for char in self._pad_callsign(callsign):
+                    frame.append((ord(char) & 0xFF) << 1)
+                frame.append(0x60 + ((ssid & 0x0F) << 1) + (0x80 if repeated else 0))
+
             # Set last bit to indicate end of address fields
-            frame[13] += 0x01
+            frame[-1] += 0x01
 
             # Set Control Field
             frame.append(self.control & 0xFF)
@@ -73,20 +83,27 @@ class AX25:
             # Set PID Field
             frame.append(self.pid & 0xFF)
 
-            # Add Payload Field
+            # Add Payload Field (str or bytes-like)
             for char in self.payload:
-                frame.append(ord(char) & 0xFF)
+                frame.append((char if isinstance(char, int) else ord(char)) & 0xFF)
 
             return frame
 
+        @staticmethod
+        def _pad_callsign(callsign):
+            return (callsign + "      ")[:6]
+
         def decode(self, frame):
+            # Raises ValueError if the address field is malformed or control/PID are missing
+            if len(frame) < 16:
+                raise ValueError("AX.25 frame too short")
             frame_index = 0
 
             # Get Destination Address
             self.dst = ''.join(chr((frame[i] & 0xFF) >> 1) for i in range(6))
             frame_index += 6
             # Get Destination SSID
-            self.dst_ssid = (frame[frame_index] & 0x0F) >> 1
+            self.dst_ssid = (frame[frame_index] >> 1) & 0x0F
             frame_index += 1
 
             # Get Command or Response Message Type
@@ -96,9 +113,22 @@ class AX25:
             self.src = ''.join(chr((frame[i] & 0xFF) >> 1) for i in range(frame_index, frame_index + 6))
             frame_index += 6
             # Get Source SSID
-            self.src_ssid = (frame[frame_index] & 0x0F) >> 1
+            self.src_ssid = (frame[frame_index] >> 1) & 0x0F
             frame_index += 1
 
+            # Get Digipeater Addresses until the end of address bit is set
+            self.digipeaters = []
+            while not frame[frame_index - 1] & 0x01:
+                if len(self.digipeaters) == self.MAX_DIGIPEATERS or frame_index + 7 > len(frame):
+                    raise ValueError("Invalid AX.25 address field")
+                callsign = ''.join(chr((frame[i] & 0xFF) >> 1) for i in range(frame_index, frame_index + 6))
+                ssid = frame[frame_index + 6]
+                self.digipeaters.append([callsign, (ssid >> 1) & 0x0F, (ssid & 0x80) != 0])
+                frame_index += 7
+
+            if frame_index + 2 > len(frame):
+                raise ValueError("AX.25 frame without control and PID fields")
+
             # Get Control Field
             self.control = frame[frame_index] & 0xFF
             frame_index += 1
@@ -177,6 +207,10 @@ class AX25:
         return encoded_frame
 
     def hdlc_decode(self, frame):
+        # Busca la primera trama entre flags con FCS válido. Un abort (7 unos
+        # seguidos) vuelve a buscar un flag, y un flag que cierra una trama
+        # inválida (incompleta o con FCS incorrecto) se toma como flag de
+        # apertura de la siguiente. Así se descarta el ruido previo a la trama.
         decoded_frame = []
 
         start_flag_found = False
@@ -191,51 +225,86 @@ class AX25:
                 bit = (frame_byte >> k) & 0x01
                 shift_register = ((shift_register << 1) + bit) & 0xFF
 
-                if not start_flag_found and shift_register == 0x7E:
+                if shift_register == 0x7E:
+                    # Al llegar el flag ya se cargaron sus primeros 7 bits
+                    if start_flag_found and bit_index == 7 and self._valid_fcs(decoded_frame):
+                        end_flag_found = True
+                        break
+                    decoded_frame = []
                     cnt = 0
                     bit_index = 0
                     byte = 0
                     start_flag_found = True
-                    break
+                    continue
 
-                if start_flag_found:
-                    if shift_register == 0x7E:
-                        end_flag_found = True
-                        break
-                    else:
-                        if bit == 0x01:
-                            cnt += 1
-                            if cnt > 6:
-                                return None
-                            byte = ((byte << 1) + bit) & 0xFF
-                            bit_index += 1
-                        elif cnt == 5:
-                            cnt = 0
-                        else:
-                            cnt = 0
-                            byte = ((byte << 1) + bit) & 0xFF
-                            bit_index += 1
-
-                        if bit_index == 8:
-                            decoded_frame.append(byte)
-                            byte = 0
-                            bit_index = 0
+                if not start_flag_found:
+                    continue
+
+                if bit == 0x01:
+                    cnt += 1
+                    if cnt > 6:
+                        # Abort: volver a buscar un flag
+                        start_flag_found = False
+                        decoded_frame = []
+                        continue
+                    byte = ((byte << 1) + bit) & 0xFF
+                    bit_index += 1
+                elif cnt == 5:
+                    # Bit de relleno
+                    cnt = 0
+                else:
+                    cnt = 0
+                    byte = ((byte << 1) + bit) & 0xFF
+                    bit_index += 1
+
+                if bit_index == 8:
+                    decoded_frame.append(byte)
+                    byte = 0
+                    bit_index = 0
 
             if end_flag_found:
                 break
 
-        # Remove CRC from frame
-        frame_crc = decoded_frame.pop()
-        frame_crc += decoded_frame.pop() << 8
+        if not end_flag_found:
+            return None
 
-        # Calculate CRC
-        crc = self.crc_calculation(decoded_frame)
+        # Remove CRC from frame
+        del decoded_frame[-2:]
 
         # Convert from LSBit to MSBit
         decoded_frame = [self.reverse_bits(byte) for byte in decoded_frame]
 
         return decoded_frame
 
+    def _valid_fcs(self, decoded_frame):
+        # Trama con al menos un byte de datos y FCS (último par de bytes) correcto
+        if len(decoded_frame) < 3:
+            return False
+        frame_crc = (decoded_frame[-2] << 8) | decoded_frame[-1]
+        return self.crc_calculation(decoded_frame[:-2]) == frame_crc
+
+    def address_signature(self, callsign, ssid):
+        # 16-bit signature of an AX.25 address for the Si4432 header check.
+        # Neither byte can be 0xFF: with broadcast enabled the Si4432 accepts
+        # 0xFF in each header byte on its own, so 0xFF is reserved for broadcast.
+        address = [(ord(char) & 0xFF) << 1 for char in self.AX25Struct._pad_callsign(callsign)]
+        address.append((ssid & 0x0F) << 1)
+        signature = self.crc_calculation(address)
+        if signature >> 8 == 0xFF:
+            signature ^= 0x0100
+        if signature & 0xFF == 0xFF:
+            signature ^= 0x0001
+        return signature
+
+    def offload_encode(self, frame):
+        # Offloaded link mode: the Si4432 packet handler sends LSB first and
+        # appends its own CRC, so no bit reversal, FCS or bit stuffing is needed
+        return bytes(frame)
+
+    def offload_decode(self, packet):
+        # The packet handler already checked the CRC and stripped the length field
+        return list(packet)
+
     @staticmethod
     def to_hex(d):
         return "0x{:02X}".format(d)
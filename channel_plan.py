@@ -0,0 +1,87 @@
+## Plan de canales precalculado ##
+# El carrier de cada portadora (REG_FREQBAND..REG_FREQCARRIER_L) se calcula una
+# sola vez. Dentro de una portadora los canales se seleccionan con
+# REG_FREQCHANNEL, es decir, cambiar de canal es una escritura de 1 byte.
+# f = portadora + canal * paso
+
+
+class ChannelPlan:
+    """Plan de canales con los registros precalculados para saltos rápidos."""
+
+    def __init__(self, radio, carriers, channels=1, step_khz=100, frames_per_hop=1):
+        if not (10 <= step_khz <= 2550) or step_khz % 10:
+            raise ValueError("Channel step must be a multiple of 10 kHz between 10 and 2550")
+        if not (1 <= channels <= 256):
+            raise ValueError("Channels must be between 1 and 256")
+        for frequency in carriers:
+            if not (240 <= frequency <= 930):
+                raise ValueError("Carrier must be between 240 and 930 MHz")
+        if frames_per_hop < 1:
+            raise ValueError("Frames per hop must be at least 1")
+
+        self.radio = radio
+        self.carriers = list(carriers)
+        self.channels = channels
+        self.step_khz = step_khz
+        self.frames_per_hop = frames_per_hop
+
+        # Registros precalculados: un triple por portadora
+        self.carrier_registers = [radio.frequency_registers(f) for f in self.carriers]
+
+        self.carrier = None
+        self.channel = None
+        self.hop_sequence = list(range(channels))
+        self.hop_index = 0
+        self.hop_frames = 0
+
+    def apply(self, carrier=0, channel=0):
+        """Escribe la portadora, el paso y el canal inicial en el radio."""
+        self.radio.set_channel_step(self.step_khz)
+        self.carrier = None
+        self.channel = None
+        self.set_carrier(carrier)
+        self.set_channel(channel)
+
+    def set_carrier(self, carrier):
+        """Cambia de portadora con una única escritura en ráfaga de 3 bytes."""
+        if carrier != self.carrier:
+            self.radio.burst_write(self.radio.REG_FREQBAND, self.carrier_registers[carrier])
+            self.radio.freq_carrier = self.carriers[carrier]
+            self.carrier = carrier
+
+    def set_channel(self, channel):
+        """Cambia de canal con una única escritura de 1 byte."""
+        if not (0 <= channel < self.channels):
+            raise ValueError("Channel out of plan")
+        if channel != self.channel:
+            self.radio.set_channel(channel)
+            self.channel = channel
+
+    def set_hop_sequence(self, sequence, frames_per_hop=None):
+        """Define el orden de los saltos y cuántas tramas se envían por canal."""
+        if not sequence:
+            raise ValueError("Hop sequence must not be empty")
+        if frames_per_hop is not None and frames_per_hop < 1:
+            raise ValueError("Frames per hop must be at least 1")
+        for channel in sequence:
+            if not (0 <= channel < self.channels):
+                raise ValueError("Channel out of plan")
+        self.hop_sequence = list(sequence)
+        self.hop_index = 0
+        self.hop_frames = 0
+        if frames_per_hop is not None:
+            self.frames_per_hop = frames_per_hop
+
+    def next_hop(self):
+        """Avanza la secuencia de saltos; se llama antes de cada trama transmitida."""
+        if self.hop_frames == 0:
+            self.set_channel(self.hop_sequence[self.hop_index])
+            self.hop_index = (self.hop_index + 1) % len(self.hop_sequence)
+        self.hop_frames = (self.hop_frames + 1) % self.frames_per_hop
+        return self.channel
+
+    def frequency(self, channel=None, carrier=None):
+        """Frecuencia en MHz de un canal del plan."""
+        channel = self.channel if channel is None else channel
+        carrier = self.carrier if carrier is None else carrier
+        return self.carriers[carrier] + channel * self.step_khz / 1000
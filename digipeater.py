@@ -0,0 +1,86 @@
+## Digipeater con caché de duplicados ##
+# Una trama se retransmite si el próximo digipeater sin el bit H de su camino
+# es nuestro indicativo o uno de los alias (por ejemplo WIDE1-1). Antes de
+# volver a codificarla se busca su huella (src, dst, CRC del payload) en un
+# diccionario acotado por un anillo de tamaño fijo: las copias que llegan por
+# otros relays dentro de la ventana de tiempo se descartan en O(1).
+
+import time
+
+
+class Digipeater:
+    """Retransmite tramas AX.25 dirigidas a nuestro indicativo o alias, sin duplicados."""
+
+    def __init__(self, ax25, callsign, ssid=0, aliases=(("WIDE1", 1),), dedup_size=64, dedup_ttl_ms=30000):
+        self.ax25 = ax25
+        self.callsign = self.ax25.AX25Struct._pad_callsign(callsign)
+        self.ssid = ssid
+        self.aliases = [(self.ax25.AX25Struct._pad_callsign(alias), alias_ssid) for alias, alias_ssid in aliases]
+        self.dedup_ttl_ms = dedup_ttl_ms
+
+        # Caché de huellas: dict para la búsqueda y anillo para acotar su tamaño
+        self.seen = {}  # huella -> (ticks_ms, posición en el anillo)
+        self.ring = [None] * dedup_size
+        self.ring_index = 0
+
+        # Contadores
+        self.relayed = 0
+        self.suppressed = 0
+        self.ignored = 0
+
+    def fingerprint(self, ax25_struct):
+        """Huella de la trama independiente del camino de digipeaters."""
+        payload = [c if isinstance(c, int) else ord(c) for c in ax25_struct.payload]
+        return (ax25_struct.src, ax25_struct.src_ssid, ax25_struct.dst, ax25_struct.dst_ssid,
+                self.ax25.crc_calculation(payload))
+
+    def is_duplicate(self, fingerprint, now):
+        entry = self.seen.get(fingerprint)
+        return entry is not None and time.ticks_diff(now, entry[0]) < self.dedup_ttl_ms
+
+    def remember(self, fingerprint, now):
+        # La huella más vieja del anillo se olvida, salvo que se haya vuelto a guardar después
+        old = self.ring[self.ring_index]
+        if old is not None and self.seen.get(old, (0, -1))[1] == self.ring_index:
+            del self.seen[old]
+        self.ring[self.ring_index] = fingerprint
+        self.seen[fingerprint] = (now, self.ring_index)
+        self.ring_index = (self.ring_index + 1) % len(self.ring)
+
+    def _next_hop(self, ax25_struct):
+        for hop in ax25_struct.digipeaters:
+            if not hop[2]:
+                return hop
+        return None
+
+    def handle(self, ax25_struct, now=None):
+        """Devuelve la trama AX.25 a retransmitir, o None si no corresponde."""
+        if now is None:
+            now = time.ticks_ms()
+
+        # Nunca retransmitir nuestras propias tramas
+        if ax25_struct.src == self.callsign and ax25_struct.src_ssid == self.ssid:
+            self.ignored += 1
+            return None
+
+        hop = self._next_hop(ax25_struct)
+        if hop is None:
+            self.ignored += 1
+            return None
+        address = (self.ax25.AX25Struct._pad_callsign(hop[0]), hop[1])
+        if address != (self.callsign, self.ssid) and address not in self.aliases:
+            self.ignored += 1
+            return None
+
+        fingerprint = self.fingerprint(ax25_struct)
+        if self.is_duplicate(fingerprint, now):
+            self.suppressed += 1
+            return None
+        self.remember(fingerprint, now)
+
+        # Marcar el salto como repetido; un alias se reemplaza por nuestro indicativo
+        hop[0] = self.callsign
+        hop[1] = self.ssid
+        hop[2] = True
+        self.relayed += 1
+        return ax25_struct.encode()
@@ -0,0 +1,126 @@
+## Compensación de Doppler con los registros de offset de frecuencia ##
+# El host calcula la curva de Doppler de la pasada (a partir del TLE) como una
+# tabla de (segundos desde AOS, Doppler en Hz). Acá se interpola cada step_ms y
+# se guarda como pasos de REG_FREQ_OFFSET1/2, así aplicar un punto es una sola
+# escritura en ráfaga de 2 bytes.
+# Para recibir se sigue el Doppler (+d) y para transmitir se precompensa (-d).
+# Opcionalmente, la corrección AFC leída después de cada paquete válido ajusta
+# un trim que se suma a la tabla (lazo cerrado). Para eso el AFC del radio se
+# habilita durante la pasada: sin él afc_corr siempre vale cero.
+#
+# El timer solo marca que toca un nuevo punto; la escritura en el radio se hace
+# desde el bucle principal con service(), para no cortar una transferencia SPI.
+
+import time
+from array import array
+
+
+def load_doppler_table(path):
+    """Lee una tabla CSV "segundos,hz" generada en el host."""
+    table = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            seconds, hz = line.split(',')
+            table.append((float(seconds), float(hz)))
+    return table
+
+
+class DopplerSchedule:
+    """Plan de offsets de frecuencia para una pasada, con trim opcional por AFC."""
+
+    def __init__(self, radio, table, step_ms=1000, closed_loop=False, trim_gain=0.5, max_trim_steps=32):
+        self.radio = radio
+        self.step_ms = step_ms
+        self.closed_loop = closed_loop
+        self.trim_gain = trim_gain
+        self.max_trim_steps = max_trim_steps
+
+        # Precalcular los pasos de offset de toda la pasada
+        step_hz = radio.frequency_offset_step()
+        duration_ms = int(table[-1][0] * 1000)
+        self.steps = array('h', [round(self._interpolate(table, t / 1000) / step_hz)
+                                 for t in range(0, duration_ms + 1, step_ms)])
+
+        self.index = 0
+        self.trim = 0  # En pasos de offset
+        self.transmitting = False
+        self.start_ms = 0
+        self.due = False
+        self.timer = None
+        self.applied = None
+        self.afc_was_enabled = False
+
+    @staticmethod
+    def _interpolate(table, seconds):
+        if seconds <= table[0][0]:
+            return table[0][1]
+        for i in range(1, len(table)):
+            t1, hz1 = table[i]
+            if seconds <= t1:
+                t0, hz0 = table[i - 1]
+                return hz0 + (hz1 - hz0) * (seconds - t0) / (t1 - t0)
+        return table[-1][1]
+
+    def offset_steps(self):
+        """Pasos de offset para el punto actual y el sentido del enlace."""
+        steps = self.steps[self.index] + self.trim
+        return -steps if self.transmitting else steps
+
+    def apply(self):
+        steps = self.offset_steps()
+        # Evitar escrituras SPI si el offset no cambió
+        if steps != self.applied:
+            self.radio.set_frequency_offset(steps)
+            self.applied = steps
+
+    def start(self, now=None, use_timer=True):
+        """Inicia la pasada (AOS) y, si se pide, el timer que marca cada punto."""
+        self.start_ms = time.ticks_ms() if now is None else now
+        self.index = 0
+        self.trim = 0
+        self.applied = None
+        self.apply()
+        if self.closed_loop:
+            self.afc_was_enabled = self.radio.afc_enabled
+            self.radio.set_afc(True)
+        if use_timer:
+            from machine import Timer
+            self.timer = Timer(period=self.step_ms, mode=Timer.PERIODIC, callback=self._on_timer)
+
+    def stop(self):
+        """Fin de la pasada (LOS): detiene el timer y quita el offset."""
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+        self.radio.set_frequency_offset(0)
+        self.applied = 0
+        if self.closed_loop:
+            self.radio.set_afc(self.afc_was_enabled)
+
+    def _on_timer(self, timer):
+        self.due = True
+
+    def service(self, now=None):
+        """Aplica el punto de la tabla que corresponde al tiempo transcurrido."""
+        now = time.ticks_ms() if now is None else now
+        self.due = False
+        self.index = min(time.ticks_diff(now, self.start_ms) // self.step_ms, len(self.steps) - 1)
+        self.apply()
+
+    def set_direction(self, transmitting):
+        """Cambia entre seguimiento en RX (+Doppler) y precompensación en TX (-Doppler)."""
+        if transmitting != self.transmitting:
+            self.transmitting = transmitting
+            self.apply()
+
+    def trim_from_afc(self):
+        """Ajusta el trim con la corrección AFC del último paquete válido."""
+        if not self.closed_loop or self.transmitting:
+            return
+        error = self.radio.read_afc_correction()
+        self.trim += int(error * self.trim_gain)
+        self.trim = max(-self.max_trim_steps, min(self.max_trim_steps, self.trim))
+        self.apply()
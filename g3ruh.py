@@ -0,0 +1,92 @@
+## Etapa NRZI + scrambler G3RUH (x^17 + x^12 + 1) para 9600 bps en modo directo ##
+# TX: hdlc_encode -> NRZI -> scrambler -> FIFO
+# RX: FIFO -> descrambler -> NRZI inverso -> hdlc_decode
+# El descrambler se sincroniza solo después de 17 bits, así que cada paquete
+# recibido puede empezar con el estado en cero si la trama va precedida de flags.
+# Los bits se procesan MSB primero, igual que la salida de hdlc_encode.
+#
+# NRZI: un 0 produce una transición y un 1 mantiene el nivel. Se resuelve con
+# tablas de 512 entradas indexadas por (nivel anterior << 8) | byte.
+# Scrambler: y[n] = x[n] ^ y[n-12] ^ y[n-17]. Como los dos taps están a 12 o más
+# bits, los 8 bits de un byte dependen solo de bytes anteriores, así que el
+# scrambler procesa un byte entero con dos shifts y un XOR sobre el estado.
+
+
+class G3RUH:
+    """Codificador/decodificador NRZI + G3RUH byte a byte con estado entre llamadas."""
+
+    STATE_MASK = 0x1FFFF  # 17 bits de historia
+
+    def __init__(self):
+        self.nrzi_encode_table = self._generate_nrzi_encode_table()
+        self.nrzi_decode_table = self._generate_nrzi_decode_table()
+        self.reset()
+
+    def _generate_nrzi_encode_table(self):
+        table = bytearray(512)
+        for level in range(2):
+            for byte in range(256):
+                out = 0
+                current = level
+                for k in range(7, -1, -1):
+                    if not (byte >> k) & 0x01:
+                        current ^= 1
+                    out = (out << 1) | current
+                table[(level << 8) | byte] = out
+        return table
+
+    def _generate_nrzi_decode_table(self):
+        table = bytearray(512)
+        for level in range(2):
+            for byte in range(256):
+                out = 0
+                previous = level
+                for k in range(7, -1, -1):
+                    bit = (byte >> k) & 0x01
+                    out = (out << 1) | (1 if bit == previous else 0)
+                    previous = bit
+                table[(level << 8) | byte] = out
+        return table
+
+    def reset(self):
+        """Reinicia el estado de TX y RX."""
+        self.tx_level = 0
+        self.tx_state = 0
+        self.reset_rx()
+
+    def reset_rx(self):
+        """Reinicia solo el estado de RX, al empezar un paquete recibido en modo directo."""
+        self.rx_level = 0
+        self.rx_state = 0
+
+    def encode(self, data):
+        """NRZI + scrambler sobre un bloque de bytes; el estado se conserva para el siguiente."""
+        table = self.nrzi_encode_table
+        level = self.tx_level
+        state = self.tx_state
+        out = bytearray(len(data))
+        for i in range(len(data)):
+            nrzi = table[(level << 8) | data[i]]
+            level = nrzi & 0x01
+            byte = (nrzi ^ (state >> 4) ^ (state >> 9)) & 0xFF
+            state = ((state << 8) | byte) & self.STATE_MASK
+            out[i] = byte
+        self.tx_level = level
+        self.tx_state = state
+        return out
+
+    def decode(self, data):
+        """Descrambler + NRZI inverso sobre un bloque de bytes con estado conservado."""
+        table = self.nrzi_decode_table
+        level = self.rx_level
+        state = self.rx_state
+        out = bytearray(len(data))
+        for i in range(len(data)):
+            byte = data[i]
+            nrzi = (byte ^ (state >> 4) ^ (state >> 9)) & 0xFF
+            state = ((state << 8) | byte) & self.STATE_MASK
+            out[i] = table[(level << 8) | nrzi]
+            level = nrzi & 0x01
+        self.rx_level = level
+        self.rx_state = state
+        return out
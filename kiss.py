@@ -0,0 +1,133 @@
+## Servidor KISS sobre TCP para la estación terrena ##
+# Expone las tramas AX.25 decodificadas (sin FCS) a varios clientes TCP en
+# formato KISS y acepta tramas KISS de los clientes para el uplink.
+# Cada cliente tiene una cola acotada: si un cliente lento la llena se
+# descartan sus tramas más viejas, sin frenar al resto ni al radio.
+# Solo para el host (CPython, asyncio). publish() se llama desde el loop.
+
+import asyncio
+
+FEND = 0xC0
+FESC = 0xDB
+TFEND = 0xDC
+TFESC = 0xDD
+CMD_DATA = 0x00
+
+
+def kiss_encode(frame, port=0):
+    """Arma una trama KISS de datos con el escape de FEND/FESC."""
+    encoded = bytearray([FEND, (port << 4) | CMD_DATA])
+    for byte in frame:
+        if byte == FEND:
+            encoded += bytes([FESC, TFEND])
+        elif byte == FESC:
+            encoded += bytes([FESC, TFESC])
+        else:
+            encoded.append(byte)
+    encoded.append(FEND)
+    return bytes(encoded)
+
+
+class KISSDecoder:
+    """Decodificador incremental de un flujo KISS."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.escaped = False
+
+    def feed(self, data):
+        """Procesa bytes recibidos y devuelve las tramas completas como (port, command, frame)."""
+        frames = []
+        for byte in data:
+            if byte == FEND:
+                if self.buffer:
+                    frames.append((self.buffer[0] >> 4, self.buffer[0] & 0x0F, bytes(self.buffer[1:])))
+                self.buffer = bytearray()
+                self.escaped = False
+            elif self.escaped:
+                self.buffer.append(FEND if byte == TFEND else FESC if byte == TFESC else byte)
+                self.escaped = False
+            elif byte == FESC:
+                self.escaped = True
+            else:
+                self.buffer.append(byte)
+        return frames
+
+
+class _Client:
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.dropped = 0
+
+
+class KISSServer:
+    """TNC KISS sobre TCP con colas acotadas por cliente."""
+
+    def __init__(self, on_uplink=None, host='127.0.0.1', port=8001, queue_size=256):
+        self.on_uplink = on_uplink  # Se llama con cada trama AX.25 recibida de un cliente
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.clients = set()
+        self.server = None
+        self.published = 0
+        self.uplinked = 0
+        self.rejected = 0  # Tramas de uplink que on_uplink rechazó (devolvió False)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # Con port=0 el sistema elige el puerto
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        for client in list(self.clients):
+            client.writer.close()
+        await self.server.wait_closed()
+
+    def publish(self, frame):
+        """Envía una trama AX.25 decodificada a todos los clientes conectados."""
+        encoded = kiss_encode(frame)  # Se codifica una sola vez para todos los clientes
+        self.published += 1
+        for client in self.clients:
+            if client.queue.full():
+                # Cliente lento: se descarta su trama más vieja
+                client.queue.get_nowait()
+                client.dropped += 1
+            client.queue.put_nowait(encoded)
+
+    async def _handle_client(self, reader, writer):
+        client = _Client(writer, self.queue_size)
+        self.clients.add(client)
+        sender = asyncio.ensure_future(self._send(client))
+        decoder = KISSDecoder()
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                for _, command, frame in decoder.feed(data):
+                    if command == CMD_DATA and frame and self.on_uplink is not None:
+                        if self.on_uplink(frame) is False:
+                            self.rejected += 1
+                        else:
+                            self.uplinked += 1
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, client):
+        try:
+            while True:
+                # Se juntan todas las tramas pendientes en una sola escritura
+                frames = [await client.queue.get()]
+                while not client.queue.empty():
+                    frames.append(client.queue.get_nowait())
+                client.writer.write(b''.join(frames))
+                await client.writer.drain()
+        except ConnectionError:
+            client.writer.close()
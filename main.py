@@ -2,60 +2,506 @@ import time
 from si4432 import Si4432
 from ticket import Ticket
 from ax25 import AX25
+from g3ruh import G3RUH
+from ticket_log import TicketLog
+from rx_ring import RxRing
+import airtime
+
+class TxFrame:
+    """Trama codificada en la cola de transmisión."""
+
+    def __init__(self, data, log_tickets, address):
+        self.data = data
+        self.log_tickets = log_tickets  # Tickets del log que lleva la trama
+        self.address = address  # Firma del destino para el header del SI4432
+        self.attempts = 0
+        self.sent = False
 
 class RadioController:
+    # Modos de enlace disponibles
+    class LinkMode:
+        HDLC = 0     # Bit reversal, FCS y bit stuffing en software
+        OFFLOAD = 1  # LSB first, CRC, header y largo en el packet handler del SI4432
+        G3RUH = 2    # HDLC + NRZI + scrambler G3RUH, sin packet handler (9600 bps)
+
+    G3RUH_SYNC_FLAGS = 4  # Flags previos para sincronizar el descrambler remoto
+    G3RUH_RX_BLOCK = 32  # Bytes por lectura de la FIFO en modo directo
+    G3RUH_RX_LENGTH = Si4432.FIFO_SIZE  # Bytes leídos después de cada sync word (trama más larga)
+    BROADCAST_ADDRESS = 0xFFFF  # Header aceptado por todos los nodos con filtrado
+    BROADCAST_CALLSIGNS = ("QST", "CQ", "ALL")
+    MAX_TX_QUEUE = 32  # Tramas pendientes como máximo (sin contar las del log)
+    MAX_TX_RETRIES = 3  # Intentos de transmisión antes de descartar una trama
+
     def __init__(self, spi, cs_pin, sdn_pin, int_pin):
         self.radio = Si4432(spi=spi, cs_pin=cs_pin, sdn_pin=sdn_pin, int_pin=int_pin)
         self.ax25 = AX25()  # Instancia de AX25
+        self.link_mode = self.LinkMode.HDLC
+        self.g3ruh = G3RUH()  # Estado NRZI/scrambler, se conserva entre tramas
+        self.tx_queue = []  # Tramas pendientes de transmisión (TxFrame)
+        self.tx_metrics = {'frames': 0, 'airtime_us': 0, 'last_airtime_us': 0, 'rejected': 0, 'dropped': 0}
+        self.rx_ring = RxRing()  # Tramas recibidas pendientes de procesar
+        self.rx_invalid = 0  # Paquetes recibidos descartados por inválidos
+        self.rx_pending = False  # La IRQ del radio marcó una interrupción sin atender
+        self.channel_plan = None  # Plan de canales para saltos de frecuencia
+        self.ticket_log = None  # Log persistente de tickets (store-and-forward)
+        self.archive = None  # Archivo de tickets recibidos (estación terrena)
+        self.digipeater = None  # Modo relay de tramas de otras estaciones
+        self.kiss_server = None  # Servidor KISS/TCP para el software de la estación terrena
+        self.addressing = False  # Header de 4 bytes con la dirección de destino (todo el enlace)
+        self.doppler = None  # Plan de compensación de Doppler de la pasada en curso
+
+    def set_archive(self, archive):
+        """Asigna el archivo donde se guardan los tickets decodificados (estación terrena)."""
+        self.archive = archive
+
+    def set_digipeater(self, digipeater):
+        """Habilita el modo digipeater; las tramas a retransmitir van a la cola de TX."""
+        self.digipeater = digipeater
+
+    def set_kiss_server(self, kiss_server):
+        """Publica las tramas recibidas por KISS/TCP y acepta uplink de los clientes."""
+        self.kiss_server = kiss_server
+        kiss_server.on_uplink = self.uplink_frame
+
+    def uplink_frame(self, ax25_frame):
+        """Agrega a la cola de transmisión una trama AX.25 (sin FCS) recibida de un cliente.
+
+        Devuelve False si la trama no es AX.25 válida, no entra en la FIFO del
+        radio una vez codificada o la cola está llena.
+        """
+        ax25_frame = list(ax25_frame)
+        if self.decode_frame(ax25_frame) is None:
+            self.tx_metrics['rejected'] += 1
+            return False
+        return self.queue_frame(ax25_frame) is not None
+
+    def set_ticket_log(self, ticket_log):
+        """Asigna el log de tickets en flash usado para store-and-forward."""
+        self.ticket_log = ticket_log
+
+    def set_channel_plan(self, channel_plan):
+        """Asigna un plan de canales; cada trama de la cola salta de canal según el plan."""
+        self.channel_plan = channel_plan
+        channel_plan.apply()
+
+    def enable_addressing(self):
+        """Envía la firma de 16 bits del próximo receptor en el header 1 y 0 del SI4432.
+
+        Es una configuración de todo el enlace: todos los nodos usan el header de
+        4 bytes, filtren o no por dirección en RX. Solo aplica a los modos con
+        packet handler (HDLC y OFFLOAD).
+        """
+        self.addressing = True
+        self.radio.set_addressing(True)
+
+    def disable_addressing(self):
+        """Vuelve al header de 2 bytes; también quita el filtro de RX."""
+        self.addressing = False
+        self.radio.set_addressing(False)
+
+    def enable_address_filter(self, callsign, ssid=0, broadcast=True, mask=0xFFFF):
+        """Filtra por hardware los paquetes que no están dirigidos a callsign-ssid.
+
+        Activa el direccionamiento del enlace (enable_addressing) y el SI4432
+        descarta los paquetes ajenos sin despertar al MCU. Con broadcast también
+        se aceptan los destinos de BROADCAST_CALLSIGNS. Un digipeater que responde
+        a alias (WIDE1-1) no debe filtrar: solo reconoce su propia dirección.
+        """
+        self.addressing = True
+        self.radio.set_address_filter(self.ax25.address_signature(callsign, ssid), broadcast, mask)
+
+    def disable_address_filter(self):
+        """Acepta paquetes con cualquier destino; el enlace sigue con el header de 4 bytes."""
+        self.radio.clear_address_filter()
+
+    def destination_address(self, ax25_frame):
+        """Firma de 16 bits del próximo receptor de una trama AX.25 para el header del SI4432.
+
+        Es el primer digipeater del camino que todavía no repitió la trama (bit H
+        en cero) o, si no hay ninguno, el destino.
+        """
+        index = 14
+        for _ in range(self.ax25.AX25Struct.MAX_DIGIPEATERS):
+            if ax25_frame[index - 1] & 0x01 or index + 7 > len(ax25_frame):
+                break
+            if not ax25_frame[index + 6] & 0x80:
+                return self._address_signature_at(ax25_frame, index)
+            index += 7
+        return self._address_signature_at(ax25_frame, 0)
+
+    def _address_signature_at(self, ax25_frame, index):
+        callsign = ''.join(chr((ax25_frame[i] & 0xFF) >> 1) for i in range(index, index + 6)).strip()
+        if callsign in self.BROADCAST_CALLSIGNS:
+            return self.BROADCAST_ADDRESS
+        return self.ax25.address_signature(callsign, (ax25_frame[index + 6] >> 1) & 0x0F)
+
+    def set_doppler_schedule(self, doppler):
+        """Asigna el plan de Doppler de la pasada; se inicia con doppler.start() en el AOS."""
+        self.doppler = doppler
+
+    def service_doppler(self):
+        """Aplica el próximo punto del plan de Doppler si el timer lo marcó."""
+        if self.doppler is not None and self.doppler.due:
+            self.doppler.service()
+
+    def set_link_mode(self, mode):
+        """Selecciona el modo de enlace y reconfigura el packet handler del radio."""
+        self.link_mode = mode
+        self.radio.set_packet_handling(mode != self.LinkMode.G3RUH, lsb_first=(mode == self.LinkMode.OFFLOAD))
+        # boot() conserva portadora, paso y canal (los del plan si hay uno) y deja el radio en reposo
+        self.radio.boot()
+        self.g3ruh.reset()
+        self.begin_receiving()
+
+    def begin_receiving(self):
+        """Pone el radio a escuchar según el modo de enlace."""
+        self.rx_ring.filled = 0  # Descartar un paquete directo a medio leer
+        if self.link_mode == self.LinkMode.G3RUH:
+            # Sin packet handler no hay fin de paquete: se leen bloques fijos después de la sync word
+            self.radio.begin_receiving_direct(self.G3RUH_RX_BLOCK)
+        else:
+            self.radio.begin_receiving()
 
     def setup_radio(self):
         """Inicializa y configura el radio SI4432."""
         try:
             self.radio.initialize()
-            self.radio.configure_baud_rate(9600)
+            self.radio.configure_baud_rate(9.6)  # En kbps
             self.radio.configure_frequency(435)
-            self.radio.begin_receiving()  # Inicia modo escucha
+            self.enable_receive_irq()
+            self.begin_receiving()  # Inicia modo escucha
             print("Radio configurado correctamente.")
         except Exception as e:
             print(f"Error al configurar el radio: {e}")
 
+    def build_frame(self, user, place, sensor_id, data, observations, day, hour):
+        """Crea un ticket y lo arma en una trama AX.25."""
+        # Crear el ticket
+        ticket = Ticket(user=user, place=place, sensor_id=sensor_id, data=data, observations=observations, day=day, hour=hour)
+        return self.build_ticket_frame(ticket.to_bytes())
+
+    def build_ticket_frame(self, ticket_data):
+        """Arma una trama AX.25 UI con los bytes de uno o más tickets como payload."""
+        # Crear la trama AX.25
+        ax25_struct = self.ax25.AX25Struct(
+            src="SRCAD",      # Cambiar Source segun corresponda
+            src_ssid=0,
+            dst="DESTAD",     # Cambiar Destination segun corresponda
+            dst_ssid=0,
+            control=0x03,     # Control para UI
+            pid=0xF0,         # PID para no específico
+            payload=ticket_data,
+            cmd_msg=True
+        )
+        return ax25_struct.encode()
+
+    def encode_frame(self, ax25_frame):
+        """Codifica una trama AX.25 según el modo de enlace."""
+        if self.link_mode == self.LinkMode.OFFLOAD:
+            return self.ax25.offload_encode(ax25_frame)
+
+        # Codificar en HDLC
+        hdlc_frame = self.ax25.hdlc_encode(ax25_frame)
+
+        if self.link_mode == self.LinkMode.G3RUH:
+            return self.g3ruh.encode(bytes([0x7E] * self.G3RUH_SYNC_FLAGS + hdlc_frame))
+        return hdlc_frame
+
+    def unwrap_packet(self, packet):
+        """Extrae la trama AX.25 (sin FCS) de un paquete recibido, o None si es inválido."""
+        if self.link_mode == self.LinkMode.OFFLOAD:
+            ax25_frame = self.ax25.offload_decode(packet)
+        elif self.link_mode == self.LinkMode.G3RUH:
+            # Cada paquete empieza después de una sync word: el descrambler arranca de cero
+            self.g3ruh.reset_rx()
+            ax25_frame = self.ax25.hdlc_decode(self.g3ruh.decode(packet))
+        else:
+            ax25_frame = self.ax25.hdlc_decode(packet)
+        if not ax25_frame or len(ax25_frame) < 16:
+            return None
+        return ax25_frame
+
+    def decode_packet(self, packet):
+        """Decodifica un paquete recibido en un AX25Struct, o None si es inválido."""
+        ax25_frame = self.unwrap_packet(packet)
+        if ax25_frame is None:
+            return None
+        return self.decode_frame(ax25_frame)
+
+    def decode_frame(self, ax25_frame):
+        """Decodifica una trama AX.25 (sin FCS), o devuelve None si sus campos son inválidos."""
+        ax25_struct = self.ax25.AX25Struct(None, None, None, None, None, None, None, None)
+        try:
+            ax25_struct.decode(ax25_frame)
+        except ValueError:
+            return None
+        return ax25_struct
+
+    def queue_ticket(self, user, place, sensor_id, data, observations, day, hour):
+        """Crea un ticket y lo agrega a la cola de transmisión."""
+        return self.queue_frame(self.build_frame(user, place, sensor_id, data, observations, day, hour))
+
+    def queue_frame(self, ax25_frame, log_tickets=0):
+        """Codifica una trama AX.25 y la agrega a la cola junto con su dirección de destino.
+
+        Devuelve la TxFrame encolada, o None si la trama codificada no entra en la
+        FIFO del radio o si la cola está llena. Las tramas del log no cuentan para
+        el límite: drain_ticket_log solo las lee con la cola vacía.
+        """
+        data = self.encode_frame(ax25_frame)
+        if len(data) > self.radio.FIFO_SIZE or (not log_tickets and len(self.tx_queue) >= self.MAX_TX_QUEUE):
+            self.tx_metrics['rejected'] += 1
+            return None
+        tx_frame = TxFrame(data, log_tickets, self.destination_address(ax25_frame))
+        self.tx_queue.append(tx_frame)
+        return tx_frame
+
+    def store_ticket(self, user, place, sensor_id, data, observations, day, hour):
+        """Crea un ticket y lo guarda en el log de flash hasta la próxima pasada."""
+        ticket = Ticket(user=user, place=place, sensor_id=sensor_id, data=data, observations=observations, day=day, hour=hour)
+        self.ticket_log.append(ticket.to_bytes())
+
+    def drain_ticket_log(self, batch_size=16, tickets_per_frame=1):
+        """Pasa un bloque de tramas del log a la cola de transmisión y lo envía.
+
+        Cada trama lleva tickets_per_frame tickets; si la trama no entra en la
+        FIFO los tickets de ese grupo se envían de a uno. Los tickets solo se
+        confirman en el log una vez transmitidos. Mientras la cola tenga tramas
+        pendientes no se leen tickets nuevos.
+        """
+        if not self.tx_queue:
+            tickets = self.ticket_log.read_batch(batch_size * tickets_per_frame)
+            for i in range(0, len(tickets), tickets_per_frame):
+                group = tickets[i:i + tickets_per_frame]
+                ax25_frame = self.build_ticket_frame(b''.join(group))
+                data = self.encode_frame(ax25_frame)
+                if len(data) <= self.radio.FIFO_SIZE:
+                    self.tx_queue.append(TxFrame(data, len(group), self.destination_address(ax25_frame)))
+                else:
+                    # División prevista, no un rechazo: no cuenta en tx_metrics['rejected']
+                    for ticket_data in group:
+                        self.queue_frame(self.build_ticket_frame(ticket_data), 1)
+        return self.process_tx_queue()
+
+    def estimate_frame_length(self, tickets_per_frame):
+        """Largo en el aire, en el peor caso de bit stuffing, de una trama con tickets_per_frame tickets."""
+        ax25_struct = self.ax25.AX25Struct("SRCAD", 0, "DESTAD", 0, 0x03, 0xF0, b'\xFF' * (16 * tickets_per_frame), True)
+        ax25_frame = ax25_struct.encode()
+        if self.link_mode == self.LinkMode.OFFLOAD:
+            return len(ax25_frame)
+        length = len(self.ax25.hdlc_encode(ax25_frame))
+        if self.link_mode == self.LinkMode.G3RUH:
+            length += self.G3RUH_SYNC_FLAGS
+        return length
+
+    def plan_pass(self, pass_s):
+        """Elige tickets por trama y tamaño de lote para vaciar el log en una pasada de pass_s segundos."""
+        backlog = self.ticket_log.pending() if self.ticket_log is not None else None
+        return airtime.plan_pass(self.radio, pass_s, self.estimate_frame_length, backlog=backlog)
+
+    def process_tx_queue(self, max_frames=None):
+        """Transmite las tramas de la cola, saltando de canal si hay un plan asignado.
+
+        Se detiene en el primer error y deja la trama fallida en la cola. Después
+        de MAX_TX_RETRIES intentos fallidos la trama se descarta; si llevaba
+        tickets del log, se sacan de la cola todas las tramas del log y el log se
+        rebobina, así esos tickets se vuelven a leer en el próximo drain.
+        Devuelve la cantidad de tramas enviadas.
+        """
+        sent = 0
+        logged = 0
+        rewind = False
+        transmitting = bool(self.tx_queue)
+        if self.doppler is not None and transmitting:
+            self.doppler.set_direction(True)  # Precompensar el Doppler al transmitir
+        while self.tx_queue and (max_frames is None or sent < max_frames):
+            tx_frame = self.tx_queue[0]
+            if self.channel_plan is not None:
+                self.channel_plan.next_hop()
+            if self.addressing:
+                self.radio.set_destination_address(tx_frame.address)
+            if not self.radio.transmit_packet(tx_frame.data):
+                tx_frame.attempts += 1
+                if tx_frame.attempts >= self.MAX_TX_RETRIES:
+                    self.tx_metrics['dropped'] += 1
+                    if tx_frame.log_tickets:
+                        self.tx_queue = [f for f in self.tx_queue if not f.log_tickets]
+                        rewind = True
+                    else:
+                        self.tx_queue.pop(0)
+                break
+            self.tx_queue.pop(0)
+            tx_frame.sent = True
+            sent += 1
+            logged += tx_frame.log_tickets
+
+            # Métricas de ocupación del canal
+            frame_airtime = airtime.frame_airtime_us(self.radio, len(tx_frame.data))
+            self.tx_metrics['frames'] += 1
+            self.tx_metrics['airtime_us'] += frame_airtime
+            self.tx_metrics['last_airtime_us'] = frame_airtime
+
+        if self.doppler is not None:
+            self.doppler.set_direction(False)
+        if transmitting:
+            # Después de transmitir el radio queda en reposo: volver a escuchar
+            self.begin_receiving()
+
+        # Confirmar en el log todos los tickets enviados con una sola escritura del header
+        if logged:
+            self.ticket_log.commit(logged)
+        if rewind:
+            self.ticket_log.rewind()
+        return sent
+
     def send_ticket(self, user, place, sensor_id, data, observations, day, hour):
         """Crea y envía un ticket usando tramas AX.25."""
         try:
-            # Crear el ticket
-            ticket = Ticket(user=user, place=place, sensor_id=sensor_id, data=data, observations=observations, day=day, hour=hour)
-            ticket_data = ticket.to_bytes()
-
-            # Crear la trama AX.25
-            ax25_struct = self.ax25.AX25Struct(
-                src="SRCAD",      # Cambiar Source segun corresponda
-                src_ssid=0,
-                dst="DESTAD",     # Cambiar Destination segun corresponda
-                dst_ssid=0,
-                control=0x03,     # Control para UI
-                pid=0xF0,         # PID para no específico
-                payload=ticket_data,
-                cmd_msg=True
-            )
-            ax25_frame = ax25_struct.encode()
-
-            # Codificar en HDLC
-            hdlc_frame = self.ax25.hdlc_encode(ax25_frame)
-
-            # Enviar la trama
-            if self.radio.transmit_packet(hdlc_frame):
+            tx_frame = self.queue_ticket(user, place, sensor_id, data, observations, day, hour)
+            if tx_frame is None:
+                print("Error: el ticket no se encoló (la cola de transmisión está llena o la trama no entra en la FIFO).")
+                return
+
+            # Enviar la trama (y las que estén antes en la cola)
+            self.process_tx_queue()
+            if tx_frame.sent:
                 print("Paquete enviado correctamente.")
             else:
                 print("Error al enviar el paquete.")
         except Exception as e:
             print(f"Error durante el envío del ticket: {e}")
 
+    def enable_receive_irq(self):
+        """Registra la IRQ del pin nIRQ del radio, si está conectado."""
+        if self.radio.int_pin is not None:
+            self.radio.int_pin.irq(trigger=self.radio.int_pin.IRQ_FALLING, handler=self._on_radio_irq)
+
+    def _on_radio_irq(self, pin):
+        # Solo se marca la interrupción: el SPI y los buffers compartidos del radio
+        # se usan únicamente desde el bucle principal, nunca a mitad de otra transferencia
+        self.rx_pending = True
+
+    def service_receive(self, timeout_ms):
+        """Atiende la recepción durante timeout_ms, en lugar de dormir en el bucle principal.
+
+        Con el pin nIRQ conectado el radio se lee solo cuando la IRQ lo marcó; sin
+        él se sondea cada milisegundo. Así no se pierden paquetes entre vueltas del
+        bucle, y en modo G3RUH se leen los bloques de la FIFO antes de que se llene.
+        Cada paquete se procesa apenas entra al anillo, así una ráfaga más larga
+        que el anillo no pierde tramas dentro de la ventana. El plan de Doppler
+        también se atiende en cada vuelta, con la resolución de su timer.
+        """
+        start = time.ticks_ms()
+        while time.ticks_diff(time.ticks_ms(), start) < timeout_ms:
+            self.service_doppler()
+            if self.rx_pending or self.radio.int_pin is None:
+                self.rx_pending = False
+                while self.poll_receive():
+                    self.process_rx_ring()
+            time.sleep_ms(1)
+
+    def poll_receive(self):
+        """Copia un paquete recibido de la FIFO al anillo de recepción sin asignar memoria.
+
+        Se llama solo desde el bucle principal (la IRQ del radio únicamente marca rx_pending).
+        """
+        if self.link_mode == self.LinkMode.G3RUH:
+            return self.poll_receive_direct()
+        if not self.radio.check_if_packet_received():
+            return False
+        if self.doppler is not None:
+            self.doppler.trim_from_afc()
+        self.rx_ring.receive(self.radio, time.ticks_ms())
+        # Volver a escuchar
+        self.radio.set_operation_mode(self.radio.idle_mode | self.radio.OperationMode.RXMode)
+        return True
+
+    def poll_receive_direct(self):
+        """Modo G3RUH: copia un bloque de la FIFO al slot en curso del anillo.
+
+        Después de G3RUH_RX_LENGTH bytes el paquete se publica y el radio vuelve
+        a buscar la sync word; hdlc_decode descarta lo que sigue al flag final.
+        """
+        if not self.radio.check_rx_fifo_almost_full():
+            return False
+        if self.rx_ring.receive_block(self.radio, self.G3RUH_RX_BLOCK, self.G3RUH_RX_LENGTH, time.ticks_ms()):
+            self.radio.restart_receiving()
+        return True
+
+    def handle_packet(self, packet, rssi):
+        """Procesa un paquete recibido: decodifica, archiva y retransmite si corresponde.
+
+        Devuelve False si el paquete no contiene una trama AX.25 válida.
+        """
+        ax25_frame = self.unwrap_packet(packet)
+        if ax25_frame is None:
+            return False
+        ax25_struct = self.decode_frame(ax25_frame)
+        if ax25_struct is None:
+            return False
+
+        if self.kiss_server is not None:
+            self.kiss_server.publish(bytes(ax25_frame))
+        print(f"Trama de {ax25_struct.src}-{ax25_struct.src_ssid} (RSSI {rssi}): {ax25_struct.payload}")
+        if self.archive is not None and ax25_struct.payload and len(ax25_struct.payload) % 16 == 0:
+            # Una trama puede llevar varios tickets de 16 bytes; extend() los escribe a disco
+            payload = bytes([ord(c) for c in ax25_struct.payload])
+            self.archive.extend(payload[i:i + 16] for i in range(0, len(payload), 16))
+        if self.digipeater is not None:
+            relay_frame = self.digipeater.handle(ax25_struct)
+            if relay_frame is not None:
+                self.queue_frame(relay_frame)
+        return True
+
+    async def run_async(self, period_s=0.005):
+        """Bucle del radio bajo asyncio, para la estación terrena junto al servidor KISS.
+
+        Cada vuelta recibe, procesa el anillo y transmite una trama de la cola
+        (incluido el uplink de los clientes), y después cede el control al loop.
+        transmit_packet espera el fin de cada trama, así que vaciar toda la cola
+        en una vuelta dejaría a los clientes KISS sin atender.
+        """
+        import asyncio
+        while True:
+            self.service_doppler()
+            self.check_for_packets()
+            if self.tx_queue:
+                self.process_tx_queue(max_frames=1)
+            await asyncio.sleep(period_s)
+
     def check_for_packets(self):
-        """Verifica si se ha recibido un paquete."""
-        if self.radio.check_if_packet_received():
+        """Verifica si se han recibido paquetes y procesa los que estén en el anillo."""
+        self.poll_receive()
+        self.process_rx_ring()
+
+    def process_rx_ring(self):
+        """Procesa y libera todas las tramas del anillo de recepción.
+
+        Un paquete que falla al procesarse se descarta igual, para no trabar el anillo.
+        """
+        index = self.rx_ring.borrow()
+        while index >= 0:
             print("Paquete recibido.")
-            packet = self.radio.retrieve_received_packet()  
-            print(f"Datos recibidos: {packet}")
+            try:
+                if not self.handle_packet(self.rx_ring.frame(index), self.rx_ring.rssi[index]):
+                    self.rx_invalid += 1
+            except Exception as e:
+                self.rx_invalid += 1
+                print(f"Error al procesar el paquete: {e}")
+            finally:
+                self.rx_ring.release()
+            index = self.rx_ring.borrow()
+
+async def ground_station(controller, host='127.0.0.1', port=8001):
+    """Estación terrena en el host: servidor KISS/TCP y bucle del radio en el mismo loop."""
+    from kiss import KISSServer
+    server = KISSServer(host=host, port=port)
+    controller.set_kiss_server(server)
+    await server.start()
+    try:
+        await controller.run_async()
+    finally:
+        await server.close()
 
 def main():
     # Inicializa la clase controladora del radio
@@ -64,10 +510,13 @@ def main():
     # Configura el radio
     controller.setup_radio()
 
+    # Los tickets se guardan en flash y se envían cuando hay enlace
+    controller.set_ticket_log(TicketLog("tickets.log"))
+
     # Bucle principal
     while True:
-        # Envía un ticket cada cierto tiempo o cuando sea necesario
-        controller.send_ticket(
+        # Guarda un ticket cada cierto tiempo o cuando sea necesario
+        controller.store_ticket(
             user=1,
             place=2,
             sensor_id=3,
@@ -77,11 +526,17 @@ def main():
             hour="120000"
         )
 
+        # Aplica el offset de Doppler del momento de la pasada
+        controller.service_doppler()
+
+        # Envía los tickets pendientes a la tasa del enlace
+        controller.drain_ticket_log()
+
         # Verifica si se ha recibido un paquete
         controller.check_for_packets()
 
-        #acá debería implementar interupciones después
-        time.sleep(1) 
+        # Atiende la recepción hasta la próxima vuelta
+        controller.service_receive(1000)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+## Varios SI4432 sobre un mismo bus SPI ##
+# Cada radio tiene sus propios pines CS/SDN/IRQ y comparte el bus SPI. Un lock
+# común envuelve cada transferencia en ráfaga (CS bajo ... CS alto, con
+# "with bus_lock"), así las transferencias de distintos radios nunca se
+# intercalan y el lock se libera aunque la transferencia falle.
+# Nota: la recepción se sondea desde el bucle principal. No llamar poll() desde
+# una IRQ programada con micropython.schedule mientras otro código usa el bus,
+# porque el lock no es reentrante.
+#
+# Roles:
+#   RX   - escucha fija en un canal
+#   TX   - transmite tramas de la cola compartida (sin bloquear); una trama que
+#          falla o vence se vuelve a encolar adelante hasta MAX_TX_RETRIES intentos
+#   SCAN - escucha recorriendo los canales de un ChannelPlan
+# Las tramas recibidas por todos los radios se entregan en un único flujo
+# ordenado por timestamp.
+
+import time
+import _thread
+from si4432 import Si4432
+from rx_ring import RxRing
+
+
+class MultiRadioController:
+    """Controlador de N radios SI4432 con roles y recepción combinada."""
+
+    class Role:
+        RX = 0
+        TX = 1
+        SCAN = 2
+
+    MAX_TX_RETRIES = 3
+
+    def __init__(self, spi, pins):
+        """pins: lista de (cs_pin, sdn_pin, int_pin), uno por radio."""
+        self.bus_lock = _thread.allocate_lock()
+        self.radios = [Si4432(spi=spi, cs_pin=cs_pin, sdn_pin=sdn_pin, int_pin=int_pin, bus_lock=self.bus_lock)
+                       for cs_pin, sdn_pin, int_pin in pins]
+        self.rx_rings = [RxRing() for _ in self.radios]
+        self.roles = [self.Role.RX] * len(self.radios)
+        self.scan_plans = [None] * len(self.radios)
+        self.scan_dwell_ms = [0] * len(self.radios)
+        self.scan_start = [0] * len(self.radios)
+        self.tx_inflight = [None] * len(self.radios)  # Trama que está transmitiendo cada radio
+        self.tx_queue = []  # Tramas pendientes [trama, intentos], compartidas por todos los radios TX
+        self.tx_metrics = {'sent': 0, 'retries': 0, 'dropped': 0}
+
+    def setup_radios(self, kbps, frequency):
+        """Inicializa todos los radios con la misma tasa y portadora."""
+        for radio in self.radios:
+            radio.initialize()
+            radio.configure_baud_rate(kbps)
+            radio.configure_frequency(frequency)
+
+    def assign_role(self, index, role, channel=0, scan_plan=None, dwell_ms=500):
+        """Asigna un rol a un radio y lo deja listo para operar."""
+        radio = self.radios[index]
+        if role == self.Role.SCAN and (scan_plan is None or scan_plan.radio is not radio):
+            raise ValueError("Scan plan must belong to the scanning radio")
+        self.roles[index] = role
+        if self.tx_inflight[index] is not None:
+            # La trama en curso vuelve a la cola para otro radio TX
+            self.tx_queue.insert(0, self.tx_inflight[index])
+            self.tx_inflight[index] = None
+
+        if role == self.Role.TX:
+            radio.set_send_blocking(False)
+            radio.set_channel(channel)
+            radio.set_operation_mode(radio.idle_mode)
+        elif role == self.Role.SCAN:
+            self.scan_plans[index] = scan_plan
+            self.scan_dwell_ms[index] = dwell_ms
+            self.scan_start[index] = time.ticks_ms()
+            scan_plan.apply()
+            radio.begin_receiving()
+        else:
+            radio.set_channel(channel)
+            radio.begin_receiving()
+
+    def poll(self):
+        """Sondea todos los radios: recepción, saltos de escaneo y transmisión."""
+        now = time.ticks_ms()
+        for index, radio in enumerate(self.radios):
+            role = self.roles[index]
+            if role == self.Role.TX:
+                self._poll_tx(index, radio)
+                continue
+
+            if radio.check_if_packet_received():
+                self.rx_rings[index].receive(radio, now)
+                radio.set_operation_mode(radio.idle_mode | radio.OperationMode.RXMode)
+            elif role == self.Role.SCAN and time.ticks_diff(now, self.scan_start[index]) >= self.scan_dwell_ms[index]:
+                # Sin paquete en curso: pasar al próximo canal del plan
+                self.scan_plans[index].next_hop()
+                self.scan_start[index] = now
+
+    def queue_frame(self, frame):
+        """Agrega una trama a la cola compartida; False si no entra en la FIFO del radio."""
+        if len(frame) > Si4432.FIFO_SIZE:
+            return False
+        self.tx_queue.append([frame, 0])
+        return True
+
+    def _poll_tx(self, index, radio):
+        entry = self.tx_inflight[index]
+        if entry is not None:
+            status = radio.check_transmit_completed()
+            if status is None:
+                return
+            self.tx_inflight[index] = None
+            if status:
+                self.tx_metrics['sent'] += 1
+            else:
+                self._retry(entry)
+        if self.tx_queue:
+            # La trama sale de la cola mientras está en el aire, así otro radio TX no la repite
+            entry = self.tx_queue.pop(0)
+            if radio.transmit_packet(entry[0]):
+                self.tx_inflight[index] = entry
+            else:
+                self._retry(entry)
+
+    def _retry(self, entry):
+        entry[1] += 1
+        if entry[1] >= self.MAX_TX_RETRIES:
+            self.tx_metrics['dropped'] += 1
+        else:
+            self.tx_metrics['retries'] += 1
+            self.tx_queue.insert(0, entry)
+
+    def next_frame(self):
+        """Devuelve (radio, índice) de la trama recibida más vieja entre todos los radios.
+
+        Devuelve None si no hay tramas. La trama se lee con frame(radio, índice)
+        y luego se libera con release(radio).
+        """
+        oldest = None
+        for radio_index, ring in enumerate(self.rx_rings):
+            index = ring.borrow()
+            if index < 0:
+                continue
+            if oldest is None or time.ticks_diff(ring.timestamps[index], oldest[2]) < 0:
+                oldest = (radio_index, index, ring.timestamps[index])
+        if oldest is None:
+            return None
+        return oldest[0], oldest[1]
+
+    def frame(self, radio_index, index):
+        return self.rx_rings[radio_index].frame(index)
+
+    def rssi(self, radio_index, index):
+        return self.rx_rings[radio_index].rssi[index]
+
+    def release(self, radio_index):
+        self.rx_rings[radio_index].release()
@@ -0,0 +1,101 @@
+## Pool de tramas preasignado + anillo de recepción ##
+# Un productor (el camino de recepción) y un consumidor (el procesamiento de
+# tramas), ambos en el bucle principal: la IRQ del radio solo marca que hay algo
+# para leer.
+# Cada posición del anillo tiene su propio slot de bytearray y sus metadatos
+# (largo, RSSI, timestamp) en arrays, así que recibir no crea buffers nuevos.
+# Las lecturas de la FIFO van a un slice del memoryview preasignado de cada slot.
+# head solo lo escribe el productor y tail solo el consumidor: no hacen falta
+# locks. El productor completa los metadatos antes de avanzar head.
+
+from array import array
+from si4432 import Si4432
+
+
+class RxRing:
+    """Anillo SPSC de tramas recibidas sobre un pool fijo de slots."""
+
+    def __init__(self, slots=8, slot_size=Si4432.FIFO_SIZE):
+        size = slots + 1  # Una posición queda libre para distinguir lleno de vacío
+        self.size = size
+        self.slots = [bytearray(slot_size) for _ in range(size)]
+        self.views = [memoryview(slot) for slot in self.slots]
+        self.lengths = array('H', [0] * size)
+        self.rssi = bytearray(size)
+        self.timestamps = array('I', [0] * size)
+        self.head = 0  # Próxima posición a llenar (productor)
+        self.tail = 0  # Próxima posición a leer (consumidor)
+        self.dropped = 0  # Tramas perdidas por anillo lleno
+        self.filled = 0  # Bytes ya copiados al slot en curso (modo directo)
+        self.block_rssi = 0
+
+    def __len__(self):
+        return (self.head - self.tail) % self.size
+
+    # --- Productor ---
+
+    def acquire(self):
+        """Devuelve el índice del slot a llenar, o -1 si el anillo está lleno."""
+        if (self.head + 1) % self.size == self.tail:
+            self.dropped += 1
+            return -1
+        return self.head
+
+    def publish(self, index, length, rssi, timestamp):
+        """Publica el slot llenado por acquire() para el consumidor."""
+        self.lengths[index] = length
+        self.rssi[index] = rssi
+        self.timestamps[index] = timestamp
+        self.head = (index + 1) % self.size
+
+    def receive(self, radio, timestamp):
+        """Copia el paquete recibido por el radio de la FIFO al próximo slot.
+
+        Devuelve False si el anillo estaba lleno y el paquete se descartó.
+        """
+        rssi = radio.read_register_value(radio.REG_RSSI)
+        index = self.acquire()
+        if index < 0:
+            radio.clear_rx_fifo()
+            return False
+        length = radio.retrieve_received_packet_into(self.views[index])
+        self.publish(index, length, rssi, timestamp)
+        return True
+
+    def receive_block(self, radio, block_size, length, timestamp):
+        """Agrega block_size bytes de la FIFO al slot en curso (modo directo, sin packet handler).
+
+        Publica el slot al juntar length bytes. Devuelve True cuando el paquete
+        terminó (publicado o descartado por anillo lleno) y el radio tiene que
+        volver a buscar la sync word.
+        """
+        if self.filled == 0:
+            # RSSI del comienzo del paquete
+            self.block_rssi = radio.read_register_value(radio.REG_RSSI)
+        index = self.acquire()
+        if index < 0:
+            self.filled = 0
+            return True
+        radio.burst_readinto(radio.REG_FIFO, self.views[index][self.filled:self.filled + block_size])
+        self.filled += block_size
+        if self.filled < length:
+            return False
+        self.publish(index, self.filled, self.block_rssi, timestamp)
+        self.filled = 0
+        return True
+
+    # --- Consumidor ---
+
+    def borrow(self):
+        """Devuelve el índice de la trama más vieja, o -1 si no hay tramas."""
+        if self.tail == self.head:
+            return -1
+        return self.tail
+
+    def frame(self, index):
+        """Vista de la trama del slot sin copiarla; válida hasta release()."""
+        return self.views[index][:self.lengths[index]]
+
+    def release(self):
+        """Devuelve al pool el slot prestado por borrow()."""
+        self.tail = (self.tail + 1) % self.size
@@ -2,6 +2,14 @@ from machine import Pin, SPI
 import time
 import math
 
+class _NoLock:
+    # Lock nulo para un radio que no comparte el bus SPI
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
 class Si4432:
     # Definiciones de tipos de modulación disponibles
     class ModulationType:
@@ -67,6 +75,10 @@ class Si4432:
     REG_CHECK_HEADER2 = 0x40
     REG_CHECK_HEADER1 = 0x41
     REG_CHECK_HEADER0 = 0x42
+    REG_HEADER_ENABLE3 = 0x43
+    REG_HEADER_ENABLE2 = 0x44
+    REG_HEADER_ENABLE1 = 0x45
+    REG_HEADER_ENABLE0 = 0x46
     REG_RECEIVED_HEADER3 = 0x47
     REG_RECEIVED_HEADER2 = 0x48
     REG_RECEIVED_HEADER1 = 0x49
@@ -89,14 +101,24 @@ class Si4432:
     REG_FREQCARRIER_L = 0x77
     REG_FREQCHANNEL = 0x79
     REG_CHANNEL_STEPSIZE = 0x7A
+    REG_RX_FIFO_CONTROL = 0x7E
     REG_FIFO = 0x7F
 
+    # Banderas de interrupción, tal como las devuelve get_int_status():
+    # REG_INT_STATUS1 en el byte alto y REG_INT_STATUS2 en el bajo
+    INT_RXFFAFULL = 0x1000
+    INT_PKSENT = 0x0400
+    INT_PKVALID = 0x0200
+    INT_CRCERROR = 0x0100
+
     # Constantes
+    FIFO_SIZE = 64  # Bytes de la FIFO de TX y de RX
     MAX_TRANSMIT_TIMEOUT = 200  # ms
     
-    def __init__(self, spi, cs_pin, sdn_pin=None, int_pin=None):
+    def __init__(self, spi, cs_pin, sdn_pin=None, int_pin=None, bus_lock=None):
          # Inicialización de pines y configuración SPI
         self.spi = spi
+        self.bus_lock = bus_lock if bus_lock is not None else _NoLock() # Lock del bus SPI si se comparte con otros radios
         self.cs = Pin(cs_pin, Pin.OUT) #Pin CS (CHIP SELECT) como salida
         self.cs.value(1) 
         self.sdn = Pin(sdn_pin, Pin.OUT) if sdn_pin is not None else None
@@ -106,6 +128,7 @@ class Si4432:
         self.freq_carrier = 433.0 # Frecuencia portadora en MHz
         self.kbps = 100 # Tasa de datos en kbps
         self.freq_channel = 0
+        self.channel_step_khz = 100 # Paso entre canales en kHz
         self.modulation_type = self.ModulationType.FSK # Tipo de modulación por defecto
         self.idle_mode = self.OperationMode.Ready
         self.transmit_power = 7
@@ -117,8 +140,21 @@ class Si4432:
         self.lsb_first = False
         self.send_blocking = True
         self.package_sign = 0xDEAD
+        self.afc_enabled = False # AFC (enafc) para corregir el offset de frecuencia en RX
+        self.header_control1 = 0x0C # Verificar header 3 y 2
+        self.header_control2 = 0x22 # Header 3 y 2, largo variable, sync word 3 y 2
+        self.preamble_length = 0x08 # Preámbulo en nibbles
+        self.rx_address = None # Dirección de 16 bits filtrada en header 1 y 0
+        self.rx_address_mask = 0xFFFF
+        self.tx_address = None
         self.send_start = 0
 
+        # Buffers preasignados: las operaciones de registro no asignan memoria
+        self._cmd = bytearray(1)
+        self._value = bytearray(1)
+        self._status = bytearray(2)
+        self._offset = bytearray(2)
+
     def initialize(self):
         # Inicialización del módulo SI4432
         if self.sdn:
@@ -162,20 +198,23 @@ class Si4432:
         self.write_register(self.REG_AFC_TIMING_CONTROL, 0x02)
         self.write_register(self.REG_AFC_LIMITER, 0xFF)
         self.write_register(self.REG_AGC_OVERRIDE, 0x60)
-        self.write_register(self.REG_AFC_LOOP_GEARSHIFT_OVERRIDE, 0x3C)
+        self.set_afc(self.afc_enabled)
 
         # Configuración de manejo de paquetes
         if self.packet_handling_enabled:
             self.write_register(self.REG_DATAACCESS_CONTROL, 0xAD | (0x40 if self.lsb_first else 0))
-            self.write_register(self.REG_HEADER_CONTROL1, 0x0C)
-            self.write_register(self.REG_HEADER_CONTROL2, 0x22)
-            self.write_register(self.REG_PREAMBLE_LENGTH, 0x08)
+            self.write_register(self.REG_HEADER_CONTROL1, self.header_control1)
+            self.write_register(self.REG_HEADER_CONTROL2, self.header_control2)
+            self.write_register(self.REG_PREAMBLE_LENGTH, self.preamble_length)
             self.write_register(self.REG_PREAMBLE_DETECTION, 0x3A)
             self.set_comms_signature(self.package_sign)
+            self.tx_address = None # El reset borra el header 1 y 0 de TX
+            if self.rx_address is not None:
+                self.write_address_filter()
         else:
             self.write_register(self.REG_DATAACCESS_CONTROL, 0x40 if self.lsb_first else 0)
 
-        self.write_register(self.REG_CHANNEL_STEPSIZE, 0x64)
+        self.set_channel_step(self.channel_step_khz)
 
         # Configuración de frecuencia, tasa de baudios y potencia de transmisión
         self.configure_frequency(self.freq_carrier)
@@ -191,58 +230,107 @@ class Si4432:
 
     def write_register(self, reg, value):
         # Escribir un valor en un registro específico
-        self.burst_write(reg, bytes([value]))
+        self._value[0] = value
+        self.burst_write(reg, self._value)
 
     def burst_write(self, start_reg, data):
         #Escribir múltiples bytes en un registro (en ráfaga)
-        self.cs.value(0)
-        self.spi.write(bytes([start_reg | 0x80]))
-        self.spi.write(data)
-        self.cs.value(1)
+        with self.bus_lock:
+            self._cmd[0] = start_reg | 0x80
+            self.cs.value(0)
+            self.spi.write(self._cmd)
+            self.spi.write(data)
+            self.cs.value(1)
 
     def burst_read(self, start_reg, length):
         #Lectura en ráfaga
-        self.cs.value(0)
-        self.spi.write(bytes([start_reg & 0x7F]))
-        result = self.spi.read(length)
-        self.cs.value(1)
+        with self.bus_lock:
+            self.cs.value(0)
+            self.spi.write(bytes([start_reg & 0x7F]))
+            result = self.spi.read(length)
+            self.cs.value(1)
         return result
 
+    def burst_readinto(self, start_reg, buf):
+        #Lectura en ráfaga sobre un buffer existente (sin asignar memoria)
+        with self.bus_lock:
+            self._cmd[0] = start_reg & 0x7F
+            self.cs.value(0)
+            self.spi.write(self._cmd)
+            self.spi.readinto(buf)
+            self.cs.value(1)
+
+    def frequency_registers(self, frequency):
+        # Calcular los valores de REG_FREQBAND, REG_FREQCARRIER_H y REG_FREQCARRIER_L
+        high_band = 1 if frequency >= 480 else 0
+        f_part = frequency / (10 * (high_band + 1)) - 24
+        freq_band = int(f_part)
+        freq_carrier = int((f_part - freq_band) * 64000)
+
+        return bytes([(1 << 6) | (high_band << 5) | (freq_band & 0x3F),
+                      (freq_carrier >> 8) & 0xFF,
+                      freq_carrier & 0xFF])
+
     def configure_frequency(self, frequency):
         # Configurar la frecuencia portadora
         if 240 <= frequency <= 930:
             self.freq_carrier = frequency
-            high_band = 1 if frequency >= 480 else 0
-            f_part = frequency / (10 * (high_band + 1)) - 24
-            freq_band = int(f_part)
-            freq_carrier = int((f_part - freq_band) * 64000)
-            
-            vals = bytes([(1 << 6) | (high_band << 5) | (freq_band & 0x3F),
-                          (freq_carrier >> 8) & 0xFF,
-                          freq_carrier & 0xFF])
-            self.burst_write(self.REG_FREQBAND, vals)
+            self.burst_write(self.REG_FREQBAND, self.frequency_registers(frequency))
+
+    def frequency_offset_step(self):
+        # Resolución de REG_FREQ_OFFSET y de la corrección AFC: 156.25 Hz (x2 en banda alta)
+        return 156.25 * (2 if self.freq_carrier >= 480 else 1)
+
+    def set_frequency_offset(self, steps):
+        # Offset de frecuencia fo[9:0] en complemento a 2 (REG_FREQ_OFFSET1 = fo[7:0], REG_FREQ_OFFSET2 = fo[9:8])
+        steps = max(-512, min(511, steps)) & 0x3FF
+        self._offset[0] = steps & 0xFF
+        self._offset[1] = steps >> 8
+        self.burst_write(self.REG_FREQ_OFFSET1, self._offset)
+
+    def set_afc(self, enabled):
+        # enafc (bit 6) de REG_AFC_LOOP_GEARSHIFT_OVERRIDE; sin AFC afc_corr queda en cero
+        self.afc_enabled = enabled
+        self.write_register(self.REG_AFC_LOOP_GEARSHIFT_OVERRIDE, 0x3C | (0x40 if enabled else 0))
+
+    def read_afc_correction(self):
+        # afc_corr[9:2] en complemento a 2, devuelto en pasos de frequency_offset_step()
+        value = self.read_register_value(self.REG_AFC_CORRECTION_READ)
+        if value & 0x80:
+            value -= 0x100
+        return value * 4
 
     def set_channel(self, channel):
         #Configurar el canal de operación
         self.freq_channel = channel
         self.write_register(self.REG_FREQCHANNEL, channel)
 
+    def set_channel_step(self, step_khz):
+        # Configurar el paso entre canales (en unidades de 10 kHz)
+        self.channel_step_khz = step_khz
+        self.write_register(self.REG_CHANNEL_STEPSIZE, (step_khz // 10) & 0xFF)
+
+    def baud_rate_registers(self, kbps):
+        # Calcular los valores de REG_TX_DATARATE1 a REG_FREQ_DEVIATION (0x6E..0x72)
+        modulation_mode1 = ((1 << 5) if kbps < 30 else 0) | \
+                           ((1 << 2) if self.manchester_inverted else 0) | \
+                           ((1 << 1) if self.manchester_enabled else 0)
+        modulation_mode2 = 0x23 if self.modulation_type == self.ModulationType.GFSK else 0x21
+        freq_dev = round(((15 if kbps <= 10 else 150) * 1000.0) / 625.0)
+
+        bps_reg_val = round((kbps * (1 << 21 if kbps < 30 else 1 << 16)) / 1000)
+
+        return bytes([(bps_reg_val >> 8) & 0xFF, bps_reg_val & 0xFF,
+                      modulation_mode1, modulation_mode2, freq_dev])
+
     def configure_baud_rate(self, kbps):
         #Configurar la tasa de baudios
         if 1 <= kbps <= 256:
             self.kbps = kbps
-            
-            modulation_mode1 = ((1 << 5) if kbps < 30 else 0) | \
-                               ((1 << 2) if self.manchester_inverted else 0) | \
-                               ((1 << 1) if self.manchester_enabled else 0)
-            modulation_mode2 = 0x23 if self.modulation_type == self.ModulationType.GFSK else 0x21
-            freq_dev = round(((15 if kbps <= 10 else 150) * 1000.0) / 625.0)
-            
-            self.burst_write(self.REG_MODULATION_MODE1, bytes([modulation_mode1, modulation_mode2, freq_dev]))
-            
-            bps_reg_val = round((kbps * (1 << 21 if kbps < 30 else 1 << 16)) / 1000)
-            self.burst_write(self.REG_TX_DATARATE1, bytes([(bps_reg_val >> 8) & 0xFF, bps_reg_val & 0xFF]))
-            
+
+            # Los registros 0x6E..0x72 son contiguos: una sola escritura en ráfaga
+            self.burst_write(self.REG_TX_DATARATE1, self.baud_rate_registers(kbps))
+
             # Set RX timings (simplified)
             self.write_register(self.REG_IF_FILTER_BW, 0x01)  # Placeholder value
             
@@ -262,13 +350,52 @@ class Si4432:
         self.write_register(self.REG_CHECK_HEADER3, signature >> 8)
         self.write_register(self.REG_CHECK_HEADER2, signature & 0xFF)
 
+    def set_addressing(self, enabled):
+        # Header de 4 bytes en TX y RX: 3 y 2 con la firma del enlace, 1 y 0 con la
+        # dirección de destino. Lo usan todos los nodos del enlace, filtren o no en RX.
+        self.header_control2 = (self.header_control2 & 0x8F) | (0x40 if enabled else 0x20)
+        self.tx_address = None
+        if not enabled:
+            self.rx_address = None
+            self.header_control1 = 0x0C
+        self.write_register(self.REG_HEADER_CONTROL1, self.header_control1)
+        self.write_register(self.REG_HEADER_CONTROL2, self.header_control2)
+
+    def set_address_filter(self, address, broadcast=True, mask=0xFFFF):
+        # Filtrar por hardware los paquetes cuyo header 1 y 0 no coincide con address.
+        # Usa el header de 4 bytes de set_addressing(). Con broadcast también se
+        # acepta 0xFF en cada byte, es decir los paquetes dirigidos a 0xFFFF.
+        self.rx_address = address
+        self.rx_address_mask = mask
+        self.header_control1 = (0x30 if broadcast else 0x00) | 0x0F # bcen header 1 y 0, verificar header 3..0
+        self.header_control2 = (self.header_control2 & 0x8F) | 0x40 # Header de 4 bytes
+        self.write_address_filter()
+
+    def clear_address_filter(self):
+        # Aceptar cualquier destino; el largo del header no cambia
+        self.rx_address = None
+        self.header_control1 = 0x0C
+        self.write_register(self.REG_HEADER_CONTROL1, self.header_control1)
+
+    def write_address_filter(self):
+        self.write_register(self.REG_HEADER_CONTROL1, self.header_control1)
+        self.write_register(self.REG_HEADER_CONTROL2, self.header_control2)
+        self.burst_write(self.REG_CHECK_HEADER1, bytes([self.rx_address >> 8, self.rx_address & 0xFF]))
+        self.burst_write(self.REG_HEADER_ENABLE3, bytes([0xFF, 0xFF, self.rx_address_mask >> 8, self.rx_address_mask & 0xFF]))
+
+    def set_destination_address(self, address):
+        # Header 1 y 0 de los paquetes transmitidos; se escribe solo si cambia
+        if address != self.tx_address:
+            self.tx_address = address
+            self.burst_write(self.REG_TRANSMIT_HEADER1, bytes([address >> 8, address & 0xFF]))
+
     def transmit_packet(self, data):
-        if len(data) <= 64:
+        if len(data) <= self.FIFO_SIZE:
             self.clear_tx_fifo()
             self.write_register(self.REG_PKG_LEN, len(data))
             self.burst_write(self.REG_FIFO, data)
             
-            self.enable_interrupt(0x04)  # INT_PKSENT
+            self.enable_interrupt(self.INT_PKSENT)
             self.get_int_status()  # Clear interrupts
             
             self.set_operation_mode(self.idle_mode | self.OperationMode.TXMode)
@@ -285,14 +412,23 @@ class Si4432:
                 continue
             
             int_status = self.get_int_status()
-            if int_status & 0x04:  # INT_PKSENT
+            if int_status & self.INT_PKSENT:
                 return True
             time.sleep_ms(1)
         return False
 
+    def check_transmit_completed(self):
+        # Versión no bloqueante de wait_transmit_completed: True si el paquete se envió,
+        # False si venció MAX_TRANSMIT_TIMEOUT y None mientras siga transmitiendo
+        if self.get_int_status() & self.INT_PKSENT:
+            return True
+        if time.ticks_diff(time.ticks_ms(), self.send_start) >= self.MAX_TRANSMIT_TIMEOUT:
+            return False
+        return None
+
     def begin_receiving(self):
         self.clear_rx_fifo()
-        self.enable_interrupt(0x03)  # INT_PKVALID | INT_CRCERROR
+        self.enable_interrupt(self.INT_PKVALID | self.INT_CRCERROR)
         self.get_int_status()
         self.set_operation_mode(self.idle_mode | self.OperationMode.RXMode)
 
@@ -301,21 +437,49 @@ class Si4432:
             return False
         
         int_status = self.get_int_status()
-        if int_status & 0x02:  # INT_PKVALID
+        if int_status & self.INT_PKVALID:
             self.set_operation_mode(self.OperationMode.TuneMode)
             return True
-        elif int_status & 0x01:  # INT_CRCERROR
+        elif int_status & self.INT_CRCERROR:
             self.set_operation_mode(self.OperationMode.Ready)
             self.clear_rx_fifo()
             self.set_operation_mode(self.idle_mode | self.OperationMode.RXMode)
         return False
 
+    def begin_receiving_direct(self, block_size):
+        # Modo FIFO sin packet handler: después de la sync word el radio carga la FIFO
+        # sin fin de paquete. INT_RXFFAFULL avisa cada vez que hay block_size bytes.
+        self.write_register(self.REG_RX_FIFO_CONTROL, block_size)
+        self.clear_rx_fifo()
+        self.enable_interrupt(self.INT_RXFFAFULL)
+        self.get_int_status()
+        self.set_operation_mode(self.idle_mode | self.OperationMode.RXMode)
+
+    def check_rx_fifo_almost_full(self):
+        if self.int_pin and self.int_pin.value() == 1:
+            return False
+        return bool(self.get_int_status() & self.INT_RXFFAFULL)
+
+    def restart_receiving(self):
+        # Descarta la FIFO y vuelve a buscar preámbulo y sync word (modo directo)
+        self.set_operation_mode(self.OperationMode.Ready)
+        self.clear_rx_fifo()
+        self.set_operation_mode(self.idle_mode | self.OperationMode.RXMode)
+
     def retrieve_received_packet(self):
         length = self.read_register_value(self.REG_RECEIVED_LENGTH)
         data = self.burst_read(self.REG_FIFO, length)
         self.clear_rx_fifo()
         return data
 
+    def retrieve_received_packet_into(self, buf):
+        # Copia el paquete recibido en buf (un memoryview preasignado) y devuelve su largo.
+        # Se leen solo los bytes del paquete; el slice del memoryview no copia el buffer.
+        length = min(self.read_register_value(self.REG_RECEIVED_LENGTH), len(buf))
+        self.burst_readinto(self.REG_FIFO, buf[:length])
+        self.clear_rx_fifo()
+        return length
+
     def clear_tx_fifo(self):
         self.write_register(self.REG_OPERATION_CONTROL, 0x01)
         self.write_register(self.REG_OPERATION_CONTROL, 0x00)
@@ -325,13 +489,15 @@ class Si4432:
         self.write_register(self.REG_OPERATION_CONTROL, 0x00)
 
     def get_int_status(self):
-        return int.from_bytes(self.burst_read(self.REG_INT_STATUS1, 2), 'big')
+        self.burst_readinto(self.REG_INT_STATUS1, self._status)
+        return (self._status[0] << 8) | self._status[1]
 
     def enable_interrupt(self, flags):
         self.burst_write(self.REG_INT_ENABLE1, flags.to_bytes(2, 'big'))
 
     def read_register_value(self, reg):
-        return self.burst_read(reg, 1)[0]
+        self.burst_readinto(reg, self._value)
+        return self._value[0]
 
     def turn_on(self):
         # Activar el módulo
@@ -0,0 +1,40 @@
+import time
+import machine
+from ticket import Ticket
+from ax25 import AX25
+from g3ruh import G3RUH
+
+# Benchmark: ciclos de MCU por trama, HDLC en software vs. modo offload (packet handler)
+# vs. G3RUH (HDLC + NRZI + scrambler en software)
+ITERATIONS = 50
+
+def build_ax25_frame(ax25):
+    ticket = Ticket(user=1, place=2, sensor_id=3, data=1234, observations="Test", day="010923", hour="120000")
+    ax25_struct = ax25.AX25Struct("SRCAD", 0, "DESTAD", 0, 0x03, 0xF0, ticket.to_bytes(), True)
+    return ax25_struct.encode()
+
+def cycles_per_frame(encode, decode, ax25_frame):
+    start = time.ticks_us()
+    for _ in range(ITERATIONS):
+        decode(encode(ax25_frame))
+    elapsed_us = time.ticks_diff(time.ticks_us(), start)
+    return elapsed_us * (machine.freq() // 1000000) // ITERATIONS
+
+def bench_link_modes():
+    ax25 = AX25()
+    ax25_frame = build_ax25_frame(ax25)
+
+    hdlc = cycles_per_frame(ax25.hdlc_encode, ax25.hdlc_decode, ax25_frame)
+    offload = cycles_per_frame(ax25.offload_encode, ax25.offload_decode, ax25_frame)
+
+    g3ruh = G3RUH()
+    g3ruh_cycles = cycles_per_frame(lambda frame: g3ruh.encode(bytes(ax25.hdlc_encode(frame))),
+                                    lambda air: ax25.hdlc_decode(g3ruh.decode(air)), ax25_frame)
+
+    print("HDLC (software):", hdlc, "ciclos/trama")
+    print("Offload (SI4432):", offload, "ciclos/trama")
+    print("G3RUH (software):", g3ruh_cycles, "ciclos/trama")
+    print("Mejora: x{:.1f}".format(hdlc / max(offload, 1)))
+
+if __name__ == "__main__":
+    bench_link_modes()
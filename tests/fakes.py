@@ -0,0 +1,162 @@
+## Bus SPI y pines falsos para probar los módulos del radio en el host ##
+# En la placa se usan machine, micropython y las funciones ticks de time reales.
+# En CPython install() agrega reemplazos mínimos (solo si faltan) antes de
+# importar si4432. El reloj es simulado: sleep_ms() lo avanza y las pruebas
+# lo mueven con advance().
+
+import struct
+import sys
+import time
+import types
+
+_clock = [0]
+
+
+def advance(ms):
+    _clock[0] += ms
+
+
+class FakePin:
+    OUT = 1
+    IN = 0
+    IRQ_FALLING = 2
+    IRQ_RISING = 1
+
+    def __init__(self, pin=None, mode=None):
+        self.pin = pin
+        self.level = 1
+        self.handler = None
+
+    def value(self, level=None):
+        if level is None:
+            return self.level
+        self.level = level
+
+    def irq(self, handler=None, trigger=None):
+        self.handler = handler
+
+
+class FakeSPI:
+    """Bus SPI con un mapa de registros del SI4432 simulado.
+
+    Registra cada escritura en ráfaga como (registro, datos). Las escrituras en
+    REG_FIFO van a tx_fifo y las lecturas de REG_FIFO salen de rx_fifo. Leer
+    REG_INT_STATUS1/2 los borra, como en el chip.
+    """
+
+    def __init__(self):
+        self.registers = bytearray(0x80)
+        self.writes = []
+        self.tx_fifo = bytearray()
+        self.rx_fifo = bytearray()
+        self.command = None
+
+    def select(self):
+        self.command = None
+
+    def write(self, data):
+        if self.command is None:
+            self.command = data[0]
+            return
+        reg = self.command & 0x7F
+        self.writes.append((reg, bytes(data)))
+        if reg == 0x7F:
+            self.tx_fifo += data
+        else:
+            self.registers[reg:reg + len(data)] = data
+
+    def readinto(self, buf):
+        reg = self.command & 0x7F
+        if reg == 0x7F:
+            length = len(buf)
+            buf[:] = self.rx_fifo[:length].ljust(length, b'\x00')
+            self.rx_fifo = self.rx_fifo[length:]
+            return
+        buf[:] = self.registers[reg:reg + len(buf)]
+        for status in (0x03, 0x04):
+            if reg <= status < reg + len(buf):
+                self.registers[status] = 0
+
+    def read(self, length):
+        buf = bytearray(length)
+        self.readinto(buf)
+        return bytes(buf)
+
+    def written(self, reg):
+        """Datos de todas las escrituras en ráfaga que empezaron en reg."""
+        return [data for start, data in self.writes if start == reg]
+
+
+class _ChipSelect(FakePin):
+    def __init__(self, spi):
+        super().__init__()
+        self.spi = spi
+
+    def value(self, level=None):
+        if level == 0:
+            self.spi.select()
+        return super().value(level)
+
+
+def install():
+    """Instala machine, micropython, ustruct y time.ticks_* si no existen."""
+    try:
+        import machine  # noqa: F401
+    except ImportError:
+        machine = types.ModuleType('machine')
+        machine.Pin = FakePin
+        machine.SPI = FakeSPI
+        sys.modules['machine'] = machine
+    try:
+        import micropython  # noqa: F401
+    except ImportError:
+        micropython = types.ModuleType('micropython')
+        micropython.schedule = lambda func, arg: func(arg)
+        sys.modules['micropython'] = micropython
+    sys.modules.setdefault('ustruct', struct)
+    if not hasattr(time, 'ticks_ms'):
+        time.ticks_ms = lambda: _clock[0]
+        time.ticks_us = lambda: _clock[0] * 1000
+        time.ticks_diff = lambda new, old: new - old
+        time.sleep_ms = advance
+
+
+def attach_spi(radio, spi=None):
+    """Conecta un radio a un FakeSPI propio; su CS marca el inicio de cada transferencia."""
+    radio.spi = FakeSPI() if spi is None else spi
+    radio.cs = _ChipSelect(radio.spi)
+    return radio
+
+
+def fake_radio(spi=None, **kwargs):
+    """Crea un Si4432 sobre un FakeSPI."""
+    install()
+    from si4432 import Si4432
+    return attach_spi(Si4432(spi=None, cs_pin=0, **kwargs), spi)
+
+
+def fake_controller(transmit=None, **kwargs):
+    """Crea un RadioController sobre un Si4432 falso.
+
+    transmit, si se da, reemplaza a transmit_packet del radio; kwargs van a fake_radio().
+    """
+    install()
+    from main import RadioController
+    controller = RadioController(spi=FakeSPI(), cs_pin=0, sdn_pin=None, int_pin=None)
+    controller.radio = fake_radio(**kwargs)
+    if transmit is not None:
+        controller.radio.transmit_packet = transmit
+    return controller
+
+
+def deliver(radio, packets):
+    """Hace que el radio reciba los paquetes de la lista, uno por check_if_packet_received()."""
+    def check_if_packet_received():
+        if not packets:
+            return False
+        packet = packets.pop(0)
+        radio.spi.rx_fifo = bytearray(packet)
+        radio.spi.registers[radio.REG_RECEIVED_LENGTH] = len(packet)
+        return True
+
+    radio.check_if_packet_received = check_if_packet_received
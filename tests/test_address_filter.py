@@ -0,0 +1,67 @@
+from fakes import fake_controller, install
+install()
+from ax25 import AX25
+
+def test_address_signature():
+    ax25 = AX25()
+    for n in range(2000):
+        for ssid in range(16):
+            signature = ax25.address_signature("N{:05d}".format(n), ssid)
+            # 0xFF en cualquiera de los dos bytes es broadcast para el SI4432
+            assert signature >> 8 != 0xFF and signature & 0xFF != 0xFF
+    assert ax25.address_signature("DIGI", 1) == ax25.address_signature("DIGI  ", 1)
+    assert ax25.address_signature("DIGI", 1) != ax25.address_signature("DIGI", 2)
+
+def test_destination_address():
+    controller = fake_controller(transmit=lambda data: True)
+    ax25 = controller.ax25
+
+    def frame(dst, digipeaters=None):
+        return ax25.AX25Struct("SRC", 0, dst, 3, 0x03, 0xF0, "", True, digipeaters=digipeaters).encode()
+
+    assert controller.destination_address(frame("DEST")) == ax25.address_signature("DEST", 3)
+    assert controller.destination_address(frame("QST")) == controller.BROADCAST_ADDRESS
+    # Con digipeaters el próximo receptor es el primero que no repitió la trama
+    path = [["RELAY", 1, True], ["DIGI", 2, False], ["WIDE2", 2, False]]
+    assert controller.destination_address(frame("DEST", path)) == ax25.address_signature("DIGI", 2)
+    path = [["RELAY", 1, True], ["DIGI", 2, True]]
+    assert controller.destination_address(frame("DEST", path)) == ax25.address_signature("DEST", 3)
+
+def test_address_registers():
+    controller = fake_controller(transmit=lambda data: True)
+    radio = controller.radio
+    registers = radio.spi.registers
+    signature = controller.ax25.address_signature("NODE", 5)
+
+    controller.enable_address_filter("NODE", 5, mask=0xFFF0)
+    assert registers[radio.REG_HEADER_CONTROL1] == 0x3F  # bcen header 1 y 0, verificar header 3..0
+    assert registers[radio.REG_HEADER_CONTROL2] & 0x70 == 0x40  # Header de 4 bytes
+    assert bytes(registers[radio.REG_CHECK_HEADER1:radio.REG_CHECK_HEADER0 + 1]) == signature.to_bytes(2, 'big')
+    assert bytes(registers[radio.REG_HEADER_ENABLE3:radio.REG_HEADER_ENABLE0 + 1]) == b'\xFF\xFF\xFF\xF0'
+
+    # Sin filtro de RX el enlace sigue con el header de 4 bytes y el destino en TX
+    controller.disable_address_filter()
+    assert registers[radio.REG_HEADER_CONTROL1] == 0x0C
+    assert registers[radio.REG_HEADER_CONTROL2] & 0x70 == 0x40
+    ax25_frame = controller.ax25.AX25Struct("NODE", 5, "DEST", 0, 0x03, 0xF0, "", True).encode()
+    controller.queue_frame(ax25_frame)
+    controller.queue_frame(ax25_frame)
+    controller.process_tx_queue()
+    destination = controller.ax25.address_signature("DEST", 0).to_bytes(2, 'big')
+    # La dirección se escribe una sola vez mientras no cambie
+    assert radio.spi.written(radio.REG_TRANSMIT_HEADER1) == [destination]
+
+    # boot() conserva el formato del enlace y vuelve a escribir el destino
+    controller.set_link_mode(controller.LinkMode.OFFLOAD)
+    assert registers[radio.REG_HEADER_CONTROL2] & 0x70 == 0x40
+    controller.queue_frame(ax25_frame)
+    controller.process_tx_queue()
+    assert radio.spi.written(radio.REG_TRANSMIT_HEADER1) == [destination, destination]
+
+    controller.disable_addressing()
+    assert registers[radio.REG_HEADER_CONTROL2] & 0x70 == 0x20  # Header de 2 bytes
+
+if __name__ == "__main__":
+    test_address_signature()
+    test_destination_address()
+    test_address_registers()
@@ -0,0 +1,33 @@
+import airtime
+
+class RadioConfig:
+    """Configuración por defecto del SI4432 en boot() a 9.6 kbps."""
+    kbps = 9.6
+    header_control2 = 0x22
+    preamble_length = 0x08
+    packet_handling_enabled = True
+    manchester_enabled = False
+    FIFO_SIZE = 64
+
+def test_frame_airtime():
+    radio = RadioConfig()
+    # 32 bits de preámbulo + (2 sync + 2 header + 1 largo + 40 datos + 2 CRC) * 8
+    assert airtime.packet_bits(radio, 40) == 32 + 47 * 8
+    assert airtime.frame_airtime_us(radio, 40) == (32 + 47 * 8) * 1000 / 9.6
+
+def test_plan_pass():
+    radio = RadioConfig()
+    # Trama de 20 bytes de overhead + 16 bytes por ticket
+    plan = airtime.plan_pass(radio, 10, lambda k: 20 + 16 * k)
+    print("Plan:", plan)
+    # Con 3 tickets la trama tiene 68 bytes y no entra en la FIFO
+    assert plan['tickets_per_frame'] == 2
+    assert plan['tickets'] == 2 * plan['batch_size']
+
+    # Con poco backlog alcanza con tramas de un ticket
+    plan = airtime.plan_pass(radio, 10, lambda k: 20 + 16 * k, backlog=3)
+    assert plan['tickets_per_frame'] == 1 and plan['tickets'] == 3
+
+if __name__ == "__main__":
+    test_frame_airtime()
+    test_plan_pass()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import archive
+from archive import TicketArchive
+
+def make_ticket(user, place, sensor_id):
+    return bytes([user >> 8, user & 0xFF, place, sensor_id]) + bytes(12)
+
+def test_archive_query():
+    path = tempfile.mkdtemp()
+    try:
+        store = TicketArchive(path)
+        # Más de un chunk para verificar el descarte por índice
+        rows = archive.CHUNK_ROWS + 100
+        for n in range(rows):
+            store.append(make_ticket(n % 50, n % 7, n % 3), timestamp=1000 + n)
+
+        assert len(store) == rows
+        assert len(store.query(user=10)) == len([n for n in range(rows) if n % 50 == 10])
+        assert [t for t, _ in store.query(timestamp=(1000 + rows - 5, 2 ** 32 - 1))] == list(range(1000 + rows - 5, 1000 + rows))
+        matches = store.query(place=3, sensor_id=(1, 2), timestamp=(1000, 1100))
+        assert [t for t, _ in matches] == [1000 + n for n in range(101) if n % 7 == 3 and n % 3 != 0]
+        store.close()
+
+        # Reabrir: el chunk incompleto se recupera y se puede seguir agregando
+        store = TicketArchive(path)
+        assert len(store) == rows
+        store.append(make_ticket(60000, 1, 1), timestamp=5)
+        assert store.query(user=60000) == [(5, make_ticket(60000, 1, 1))]
+        print("Chunks:", len(store.chunks))
+        store.close()
+    finally:
+        shutil.rmtree(path)
+
+class WriteCounter:
+    """Envuelve un archivo y anota cuántos bytes se escriben en cada write()."""
+
+    def __init__(self, file, writes):
+        self.file = file
+        self.writes = writes
+
+    def write(self, data):
+        self.writes.append(len(data))
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+def test_archive_incremental_flush():
+    path = tempfile.mkdtemp()
+    try:
+        store = TicketArchive(path)
+        store.extend([make_ticket(1, 1, 1), make_ticket(2, 2, 2)], timestamp=10)
+        chunk_path = store._chunk_path(0)
+        # El chunk se reservó completo y flush() solo escribe las filas nuevas
+        assert os.path.getsize(chunk_path) == archive.CHUNK_SIZE
+        writes = []
+        store.chunk_file = WriteCounter(store.chunk_file, writes)
+        store.extend([make_ticket(3, 3, 3)], timestamp=11)
+        assert sum(writes) == archive.CHUNK_SIZE // archive.CHUNK_ROWS
+
+        # Sin close(): lo escrito por flush() ya está en disco
+        reopened = TicketArchive(path)
+        assert [t for t, _ in reopened.query()] == [10, 10, 11]
+        reopened.close()
+        store.chunk_file = store.chunk_file.file
+        store.close()
+    finally:
+        shutil.rmtree(path)
+
+if __name__ == "__main__":
+    test_archive_query()
+    test_archive_incremental_flush()
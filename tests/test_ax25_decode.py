@@ -0,0 +1,64 @@
+from fakes import fake_controller, install
+install()
+from ax25 import AX25
+
+def decode_error(ax25, frame):
+    try:
+        ax25.AX25Struct(None, None, None, None, None, None, None, None).decode(frame)
+    except ValueError:
+        return True
+    return False
+
+def test_ax25_decode_malformed():
+    ax25 = AX25()
+    # Sin bit de fin de dirección: no quedan bytes para control y PID
+    assert decode_error(ax25, [0x40] * 21)
+    assert decode_error(ax25, [0x40] * 10)
+    # Más de 8 digipeaters
+    path = [["WIDE", n, False] for n in range(9)]
+    assert decode_error(ax25, ax25.AX25Struct("SRC", 0, "DST", 0, 0x03, 0xF0, "", True, digipeaters=path).encode())
+    path = path[:8]
+    frame = ax25.AX25Struct("SRC", 0, "DST", 0, 0x03, 0xF0, "", True, digipeaters=path).encode()
+    assert not decode_error(ax25, frame)
+    # Direcciones completas pero sin control/PID
+    assert decode_error(ax25, frame[:-2])
+
+def test_hdlc_decode_fcs():
+    ax25 = AX25()
+    ax25_frame = ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, "Pehuensat III", True).encode()
+    hdlc_frame = ax25.hdlc_encode(ax25_frame)
+    assert ax25.hdlc_decode(hdlc_frame) == ax25_frame
+    # Un bit cambiado en el medio de la trama: FCS incorrecto
+    hdlc_frame[10] ^= 0x10
+    assert ax25.hdlc_decode(hdlc_frame) is None
+
+class KISSRecorder:
+    def __init__(self):
+        self.frames = []
+
+    def publish(self, frame):
+        self.frames.append(frame)
+
+def test_check_for_packets_skips_malformed():
+    controller = fake_controller()
+    controller.link_mode = controller.LinkMode.OFFLOAD
+    controller.kiss_server = KISSRecorder()
+    valid = controller.ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, "Pehuensat III", True).encode()
+
+    assert controller.decode_packet(bytes([0x40] * 21)) is None
+    ring = controller.rx_ring
+    for packet in (bytes([0x40] * 21), bytes(valid)):
+        index = ring.acquire()
+        ring.slots[index][:len(packet)] = packet
+        ring.publish(index, len(packet), 0, 0)
+
+    controller.check_for_packets()
+    # La trama inválida se descarta y la siguiente se procesa
+    assert controller.rx_invalid == 1
+    assert controller.kiss_server.frames == [bytes(valid)]
+    assert ring.borrow() < 0
+
+if __name__ == "__main__":
+    test_ax25_decode_malformed()
+    test_hdlc_decode_fcs()
+    test_check_for_packets_skips_malformed()
@@ -0,0 +1,72 @@
+from fakes import fake_controller, fake_radio, install
+install()
+from channel_plan import ChannelPlan
+
+def raises_value_error(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except ValueError:
+        return True
+    return False
+
+def test_channel_plan_validation():
+    radio = fake_radio()
+    assert raises_value_error(ChannelPlan, radio, [435], step_khz=105)
+    assert raises_value_error(ChannelPlan, radio, [435], channels=0)
+    assert raises_value_error(ChannelPlan, radio, [1000])
+    assert raises_value_error(ChannelPlan, radio, [435], frames_per_hop=0)
+
+    plan = ChannelPlan(radio, [435], channels=4)
+    assert raises_value_error(plan.set_hop_sequence, [])
+    assert raises_value_error(plan.set_hop_sequence, [0, 4])
+    assert raises_value_error(plan.set_hop_sequence, [0, 1], frames_per_hop=0)
+
+def test_channel_plan_registers():
+    radio = fake_radio()
+    plan = ChannelPlan(radio, [435, 436.5], channels=4, step_khz=250)
+    plan.apply(carrier=1, channel=2)
+    spi = radio.spi
+    assert spi.written(radio.REG_CHANNEL_STEPSIZE) == [bytes([25])]
+    assert spi.written(radio.REG_FREQBAND) == [radio.frequency_registers(436.5)]
+    assert spi.written(radio.REG_FREQCHANNEL) == [bytes([2])]
+    assert plan.frequency() == 436.5 + 2 * 0.25
+
+    # Cambiar a la portadora o el canal actual no escribe nada
+    spi.writes.clear()
+    plan.set_carrier(1)
+    plan.set_channel(2)
+    assert spi.writes == []
+
+def test_channel_plan_hops():
+    radio = fake_radio()
+    plan = ChannelPlan(radio, [435], channels=4)
+    plan.apply()
+    plan.set_hop_sequence([3, 1], frames_per_hop=2)
+    hops = [plan.next_hop() for _ in range(6)]
+    print("Saltos:", hops)
+    assert hops == [3, 3, 1, 1, 3, 3]
+    # Una escritura de 1 byte por salto
+    assert radio.spi.written(radio.REG_FREQCHANNEL)[1:] == [b'\x03', b'\x01', b'\x03']
+
+def test_link_mode_keeps_plan():
+    controller = fake_controller()
+    radio = controller.radio
+    controller.set_channel_plan(ChannelPlan(radio, [435, 437], channels=4, step_khz=50))
+    controller.channel_plan.set_carrier(1)
+    controller.channel_plan.set_channel(3)
+
+    radio.spi.writes.clear()
+    controller.set_link_mode(controller.LinkMode.OFFLOAD)
+    registers = radio.spi.registers
+    # boot() vuelve a escribir el paso, la portadora y el canal del plan
+    assert registers[radio.REG_CHANNEL_STEPSIZE] == 5
+    assert bytes(registers[radio.REG_FREQBAND:radio.REG_FREQCARRIER_L + 1]) == radio.frequency_registers(437)
+    assert registers[radio.REG_FREQCHANNEL] == 3
+    # y el radio queda escuchando
+    assert radio.spi.written(radio.REG_STATE)[-1] == bytes([radio.idle_mode | radio.OperationMode.RXMode])
+
+if __name__ == "__main__":
+    test_channel_plan_validation()
+    test_channel_plan_registers()
+    test_channel_plan_hops()
+    test_link_mode_keeps_plan()
@@ -0,0 +1,44 @@
+from fakes import install
+install()
+from ax25 import AX25
+from digipeater import Digipeater
+
+def decode(ax25, frame):
+    ax25_struct = ax25.AX25Struct(None, None, None, None, None, None, None, None)
+    ax25_struct.decode(frame)
+    return ax25_struct
+
+def test_digipeater_relay_and_dedup():
+    ax25 = AX25()
+    digipeater = Digipeater(ax25, "DIGI", ssid=1, dedup_size=4, dedup_ttl_ms=1000)
+
+    frame = ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, "Pehuensat III", True,
+                            digipeaters=[["WIDE1", 1, False]]).encode()
+
+    relayed = digipeater.handle(decode(ax25, frame), now=0)
+    relayed_struct = decode(ax25, relayed)
+    print("Path:", relayed_struct.digipeaters)
+    assert relayed_struct.digipeaters == [["DIGI  ", 1, True]]
+    assert relayed_struct.payload == "Pehuensat III"
+
+    # La misma trama por otro camino dentro de la ventana se descarta
+    assert digipeater.handle(decode(ax25, frame), now=500) is None
+    # Ya repetida por nosotros: no hay próximo salto
+    assert digipeater.handle(relayed_struct, now=600) is None
+    # Vencida la ventana vuelve a retransmitirse
+    assert digipeater.handle(decode(ax25, frame), now=1500) is not None
+
+    assert (digipeater.relayed, digipeater.suppressed, digipeater.ignored) == (2, 1, 1)
+
+def test_digipeater_cache_bounded():
+    ax25 = AX25()
+    digipeater = Digipeater(ax25, "DIGI", dedup_size=4)
+    for n in range(10):
+        frame = ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, str(n), True,
+                                digipeaters=[["DIGI", 0, False]]).encode()
+        assert digipeater.handle(decode(ax25, frame), now=n) is not None
+    assert len(digipeater.seen) == 4
+
+if __name__ == "__main__":
+    test_digipeater_relay_and_dedup()
+    test_digipeater_cache_bounded()
@@ -0,0 +1,96 @@
+from fakes import advance, fake_controller, install
+install()
+from doppler import DopplerSchedule
+
+class DopplerRadio:
+    """Radio de prueba: anota los offsets escritos y devuelve una corrección AFC fija."""
+
+    def __init__(self, afc_correction=0):
+        self.offsets = []
+        self.afc_correction = afc_correction
+        self.afc_enabled = False
+
+    def frequency_offset_step(self):
+        return 156.25
+
+    def set_frequency_offset(self, steps):
+        self.offsets.append(steps)
+
+    def read_afc_correction(self):
+        return self.afc_correction
+
+    def set_afc(self, enabled):
+        self.afc_enabled = enabled
+
+TABLE = [(0, 1000.0), (10, -1000.0), (20, -1500.0)]
+
+def test_doppler_steps():
+    schedule = DopplerSchedule(DopplerRadio(), TABLE, step_ms=1000)
+    assert len(schedule.steps) == 21
+    # Interpolación lineal entre puntos y conversión a pasos de 156.25 Hz
+    assert schedule._interpolate(TABLE, 2.5) == 500.0
+    assert schedule._interpolate(TABLE, 15) == -1250.0
+    assert schedule._interpolate(TABLE, 30) == -1500.0
+    assert list(schedule.steps[:3]) == [round(1000 / 156.25), round(800 / 156.25), round(600 / 156.25)]
+    assert schedule.steps[5] == 0 and schedule.steps[20] == round(-1500 / 156.25)
+
+def test_doppler_service_and_direction():
+    radio = DopplerRadio()
+    schedule = DopplerSchedule(radio, TABLE, step_ms=1000)
+    schedule.start(now=0, use_timer=False)
+    assert radio.offsets == [6]
+
+    # El mismo punto no vuelve a escribir el radio
+    schedule.service(now=400)
+    assert radio.offsets == [6]
+    schedule.service(now=1000)
+    assert radio.offsets == [6, 5]
+    # Al transmitir se precompensa con el signo contrario
+    schedule.set_direction(True)
+    schedule.set_direction(True)
+    assert radio.offsets == [6, 5, -5]
+    schedule.set_direction(False)
+    # Después del final de la tabla se queda en el último punto
+    schedule.service(now=60000)
+    assert radio.offsets == [6, 5, -5, 5, schedule.steps[-1]]
+    schedule.stop()
+    assert radio.offsets[-1] == 0
+
+def test_doppler_afc_trim():
+    radio = DopplerRadio(afc_correction=100)
+    schedule = DopplerSchedule(radio, TABLE, closed_loop=True, trim_gain=0.5, max_trim_steps=32)
+    schedule.start(now=0, use_timer=False)
+    # El lazo cerrado necesita el AFC habilitado durante la pasada
+    assert radio.afc_enabled
+
+    schedule.trim_from_afc()
+    assert schedule.trim == 32 and radio.offsets[-1] == 6 + 32
+    radio.afc_correction = -20
+    schedule.trim_from_afc()
+    assert schedule.trim == 22
+
+    # En TX no se lee el AFC
+    schedule.set_direction(True)
+    schedule.trim_from_afc()
+    assert schedule.trim == 22 and radio.offsets[-1] == -(6 + 22)
+
+    schedule.stop()
+    assert not radio.afc_enabled
+
+def test_doppler_serviced_while_receiving():
+    controller = fake_controller()
+    radio = DopplerRadio()
+    schedule = DopplerSchedule(radio, TABLE, step_ms=1000)
+    controller.set_doppler_schedule(schedule)
+    schedule.start(use_timer=False)
+    advance(2000)
+    # El timer marca el punto a mitad de la ventana de recepción
+    schedule.due = True
+    controller.service_receive(5)
+    assert radio.offsets == [6, round(600 / 156.25)] and not schedule.due
+
+if __name__ == "__main__":
+    test_doppler_steps()
+    test_doppler_service_and_direction()
+    test_doppler_afc_trim()
+    test_doppler_serviced_while_receiving()
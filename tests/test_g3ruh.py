@@ -0,0 +1,74 @@
+from fakes import fake_controller, install
+install()
+from ax25 import AX25
+from g3ruh import G3RUH
+
+# Referencia bit a bit para verificar la versión por tablas
+def reference_encode(data):
+    level = 0
+    state = 0
+    out = []
+    for byte in data:
+        value = 0
+        for k in range(7, -1, -1):
+            bit = (byte >> k) & 0x01
+            if not bit:
+                level ^= 1
+            scrambled = level ^ ((state >> 11) & 0x01) ^ ((state >> 16) & 0x01)
+            state = ((state << 1) | scrambled) & 0x1FFFF
+            value = (value << 1) | scrambled
+        out.append(value)
+    return bytes(out)
+
+def test_g3ruh_bit_exact():
+    data = bytes(range(256)) * 2
+    g3ruh = G3RUH()
+    # Procesar en bloques de distinto tamaño para verificar el estado entre llamadas
+    encoded = g3ruh.encode(data[:7]) + g3ruh.encode(data[7:300]) + g3ruh.encode(data[300:])
+    assert bytes(encoded) == reference_encode(data)
+
+    decoded = g3ruh.decode(encoded[:100]) + g3ruh.decode(encoded[100:])
+    assert bytes(decoded) == data
+
+def test_g3ruh_hdlc_pipeline():
+    ax25 = AX25()
+    ax25_struct = ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, "Pehuensat III", True)
+    ax25_frame = ax25_struct.encode()
+
+    tx = G3RUH()
+    rx = G3RUH()
+    # Flags previos para sincronizar el descrambler
+    air = tx.encode(bytes([0x7E] * 4 + ax25.hdlc_encode(ax25_frame)))
+    decoded_frame = ax25.hdlc_decode(rx.decode(air))
+    print("Decoded AX25 Frame:", [ax25.to_hex(b) for b in decoded_frame])
+    assert decoded_frame == ax25_frame
+
+def test_g3ruh_direct_receive():
+    controller = fake_controller()
+    radio = controller.radio
+    controller.set_link_mode(controller.LinkMode.G3RUH)
+    # Interrupción cada G3RUH_RX_BLOCK bytes en la FIFO
+    assert radio.spi.registers[radio.REG_RX_FIFO_CONTROL] == controller.G3RUH_RX_BLOCK
+    assert radio.spi.written(radio.REG_INT_ENABLE1)[-1] == radio.INT_RXFFAFULL.to_bytes(2, 'big')
+
+    noise = bytes((n * 97 + 13) & 0xFF for n in range(64))
+    for n in range(20):
+        # El scrambler de TX sigue corriendo entre tramas; el de RX arranca de cero en cada una
+        ax25_frame = controller.ax25.AX25Struct("SRCAD", 0, "DESTAD", 0, 0x03, 0xF0, bytes([n]) * (n % 16 + 1), True).encode()
+        data = controller.encode_frame(ax25_frame)
+        # Después de la trama la FIFO sigue cargando ruido hasta completar la lectura
+        radio.spi.rx_fifo = bytearray(data + noise[:controller.G3RUH_RX_LENGTH - len(data)])
+        for _ in range(controller.G3RUH_RX_LENGTH // controller.G3RUH_RX_BLOCK):
+            radio.spi.registers[radio.REG_INT_STATUS1] = radio.INT_RXFFAFULL >> 8
+            assert controller.poll_receive()
+        assert not controller.poll_receive()
+
+        index = controller.rx_ring.borrow()
+        assert controller.unwrap_packet(controller.rx_ring.frame(index)) == ax25_frame
+        controller.rx_ring.release()
+    assert controller.rx_ring.borrow() < 0
+
+if __name__ == "__main__":
+    test_g3ruh_bit_exact()
+    test_g3ruh_hdlc_pipeline()
+    test_g3ruh_direct_receive()
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from fakes import deliver, fake_controller, install
+install()
+from ax25 import AX25
+from kiss import KISSServer, KISSDecoder, kiss_encode
+
+CLIENTS = 24
+FRAMES = 2000
+
+def test_kiss_escape():
+    frame = bytes([0x01, 0xC0, 0xDB, 0x02])
+    decoded = KISSDecoder().feed(kiss_encode(frame) + kiss_encode(b'\x03'))
+    assert decoded == [(0, 0, frame), (0, 0, b'\x03')]
+
+class LoopbackRadio:
+    """Radio de prueba: lo que se transmite vuelve como recibido."""
+
+    def __init__(self, ax25, server):
+        self.ax25 = ax25
+        self.server = server
+
+    def uplink(self, ax25_frame):
+        hdlc_frame = self.ax25.hdlc_encode(list(ax25_frame))
+        self.server.publish(bytes(self.ax25.hdlc_decode(hdlc_frame)))
+
+async def read_frames(reader, count):
+    decoder = KISSDecoder()
+    frames = []
+    while len(frames) < count:
+        frames.extend(decoder.feed(await reader.read(65536)))
+    return frames
+
+async def run_loopback():
+    ax25 = AX25()
+    server = KISSServer(port=0, queue_size=FRAMES)
+    radio = LoopbackRadio(ax25, server)
+    server.on_uplink = radio.uplink
+    await server.start()
+
+    connections = [await asyncio.open_connection('127.0.0.1', server.port) for _ in range(CLIENTS)]
+    while len(server.clients) < CLIENTS:
+        await asyncio.sleep(0.01)
+
+    # Uplink de un cliente a través de hdlc_encode y vuelta por el loopback a todos
+    ax25_frame = ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, "Pehuensat III", True).encode()
+    connections[0][1].write(kiss_encode(bytes(ax25_frame)))
+    for reader, _ in connections:
+        assert (await read_frames(reader, 1))[0][2] == bytes(ax25_frame)
+
+    # Throughput: FRAMES tramas a todos los clientes
+    start = time.perf_counter()
+    for n in range(FRAMES):
+        server.publish(bytes(ax25_frame[:-2]) + n.to_bytes(2, 'big'))
+        if n % 100 == 0:
+            await asyncio.sleep(0)
+    results = await asyncio.gather(*[read_frames(reader, FRAMES) for reader, _ in connections])
+    elapsed = time.perf_counter() - start
+    print("Tramas/s por cliente: {:.0f}".format(FRAMES / elapsed))
+    for frames in results:
+        assert [int.from_bytes(f[2][-2:], 'big') for f in frames] == list(range(FRAMES))
+
+    for _, writer in connections:
+        writer.close()
+    await server.close()
+
+def test_kiss_loopback():
+    asyncio.run(run_loopback())
+
+async def run_slow_client():
+    server = KISSServer(port=0, queue_size=4)
+    await server.start()
+    reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+    while not server.clients:
+        await asyncio.sleep(0.01)
+    client = next(iter(server.clients))
+
+    # Sin ceder el loop el cliente no puede vaciar su cola: se descartan las más viejas
+    for n in range(10):
+        server.publish(bytes([n]))
+    assert client.dropped == 6
+    frames = await read_frames(reader, 4)
+    assert [frame for _, _, frame in frames] == [bytes([n]) for n in range(6, 10)]
+
+    writer.close()
+    await server.close()
+
+def test_kiss_slow_client():
+    asyncio.run(run_slow_client())
+
+def loopback_controller():
+    """RadioController cuyo radio recibe lo mismo que transmite."""
+    on_air = []
+
+    def transmit_packet(data):
+        on_air.append(bytes(data))
+        return True
+
+    controller = fake_controller(transmit=transmit_packet)
+    deliver(controller.radio, on_air)
+    return controller
+
+async def run_ground_station():
+    controller = loopback_controller()
+    server = KISSServer(port=0)
+    controller.set_kiss_server(server)
+    await server.start()
+    runner = asyncio.ensure_future(controller.run_async(period_s=0.001))
+    reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+    while not server.clients:
+        await asyncio.sleep(0.01)
+
+    ax25 = controller.ax25
+    ax25_frame = bytes(ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, "Pehuensat III", True).encode())
+    # Uplink inválido: no es AX.25 o no entra en la FIFO una vez codificado
+    writer.write(kiss_encode(bytes([0x40] * 21)))
+    writer.write(kiss_encode(ax25_frame + bytes(48)))
+    # Uplink válido: sale por el radio, vuelve por el loopback y llega al cliente
+    writer.write(kiss_encode(ax25_frame))
+    frames = await asyncio.wait_for(read_frames(reader, 1), 5)
+    assert frames[0][2] == ax25_frame
+    assert server.rejected == 2 and server.uplinked == 1
+    assert controller.tx_metrics['frames'] == 1
+
+    runner.cancel()
+    writer.close()
+    await server.close()
+
+def test_kiss_ground_station():
+    asyncio.run(run_ground_station())
+
+async def run_tx_turns():
+    controller = loopback_controller()
+    ax25_frame = controller.ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, "Pehuensat III", True).encode()
+    for _ in range(3):
+        controller.queue_frame(ax25_frame)
+    runner = asyncio.ensure_future(controller.run_async(period_s=0.001))
+    # Una trama por vuelta: el loop recupera el control entre tramas
+    await asyncio.sleep(0)
+    assert len(controller.tx_queue) == 2
+    runner.cancel()
+
+def test_kiss_tx_one_frame_per_turn():
+    asyncio.run(run_tx_turns())
+
+if __name__ == "__main__":
+    test_kiss_escape()
+    test_kiss_loopback()
+    test_kiss_slow_client()
+    test_kiss_ground_station()
+    test_kiss_tx_one_frame_per_turn()
@@ -0,0 +1,134 @@
+import threading
+from fakes import FakeSPI, attach_spi, advance, install
+install()
+from channel_plan import ChannelPlan
+from multi_radio import MultiRadioController
+
+def make_controller(count):
+    controller = MultiRadioController(FakeSPI(), [(n, None, None) for n in range(count)])
+    for radio in controller.radios:
+        attach_spi(radio)
+    return controller
+
+class SharedBus:
+    """Cuenta los CS en bajo al mismo tiempo sobre un bus compartido."""
+
+    def __init__(self):
+        self.selected = 0
+        self.collisions = 0
+
+class BusChipSelect:
+    def __init__(self, bus, cs):
+        self.bus = bus
+        self.cs = cs
+
+    def value(self, level=None):
+        if level == 0:
+            self.bus.selected += 1
+            if self.bus.selected > 1:
+                self.bus.collisions += 1
+        elif level == 1:
+            self.bus.selected -= 1
+        return self.cs.value(level)
+
+def test_bus_arbitration():
+    controller = make_controller(3)
+    bus = SharedBus()
+    for radio in controller.radios:
+        radio.cs = BusChipSelect(bus, radio.cs)
+
+    def worker(radio):
+        for n in range(2000):
+            radio.write_register(radio.REG_FREQCHANNEL, n & 0xFF)
+            radio.read_register_value(radio.REG_DEV_STATUS)
+
+    threads = [threading.Thread(target=worker, args=(radio,)) for radio in controller.radios]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert bus.collisions == 0 and bus.selected == 0
+    assert not controller.bus_lock.locked()
+
+    # Una transferencia que falla libera el lock
+    radio = controller.radios[0]
+    radio.spi.write = None
+    try:
+        radio.write_register(radio.REG_FREQCHANNEL, 1)
+    except TypeError:
+        pass
+    assert not controller.bus_lock.locked()
+
+def test_roles():
+    controller = make_controller(2)
+    rx, scan = controller.radios
+    plan = ChannelPlan(scan, [435], channels=3)
+
+    # El plan de escaneo tiene que ser del mismo radio
+    try:
+        controller.assign_role(0, controller.Role.SCAN, scan_plan=plan)
+        assert False
+    except ValueError:
+        pass
+
+    controller.assign_role(0, controller.Role.RX, channel=2)
+    controller.assign_role(1, controller.Role.SCAN, scan_plan=ChannelPlan(scan, [435], channels=3), dwell_ms=100)
+    assert rx.spi.registers[rx.REG_FREQCHANNEL] == 2
+    assert rx.spi.written(rx.REG_STATE)[-1] == bytes([rx.idle_mode | rx.OperationMode.RXMode])
+
+    channels = []
+    for _ in range(4):
+        advance(100)
+        controller.poll()
+        channels.append(scan.spi.registers[scan.REG_FREQCHANNEL])
+    assert channels == [0, 1, 2, 0]
+    # El radio RX no cambia de canal
+    assert rx.spi.registers[rx.REG_FREQCHANNEL] == 2
+
+def test_tx_retries():
+    controller = make_controller(1)
+    radio = controller.radios[0]
+    controller.assign_role(0, controller.Role.TX)
+    assert not controller.queue_frame(bytes(65))
+    assert controller.queue_frame(b'A') and controller.queue_frame(b'B')
+
+    controller.poll()
+    assert radio.spi.tx_fifo == b'A' and len(controller.tx_queue) == 1
+    controller.poll()  # Todavía transmitiendo
+    assert radio.spi.tx_fifo == b'A'
+
+    radio.spi.registers[radio.REG_INT_STATUS1] = radio.INT_PKSENT >> 8
+    controller.poll()
+    assert controller.tx_metrics['sent'] == 1 and radio.spi.tx_fifo == b'AB'
+
+    # Vence el timeout: la trama vuelve a la cola y se reintenta, hasta descartarla
+    for attempt in range(controller.MAX_TX_RETRIES):
+        advance(radio.MAX_TRANSMIT_TIMEOUT)
+        controller.poll()
+    assert controller.tx_metrics == {'sent': 1, 'retries': 2, 'dropped': 1}
+    assert radio.spi.tx_fifo == b'ABBB' and controller.tx_queue == []
+
+def test_next_frame_merge():
+    controller = make_controller(3)
+    # Cada radio recibe en orden; entre radios los timestamps se intercalan
+    arrivals = [(2, 5), (0, 30), (1, 10), (2, 20), (1, 40), (0, 50)]
+    for radio_index, timestamp in arrivals:
+        ring = controller.rx_rings[radio_index]
+        index = ring.acquire()
+        ring.slots[index][0] = timestamp
+        ring.publish(index, 1, 0, timestamp)
+
+    merged = []
+    entry = controller.next_frame()
+    while entry is not None:
+        radio_index, index = entry
+        merged.append(bytes(controller.frame(radio_index, index))[0])
+        controller.release(radio_index)
+        entry = controller.next_frame()
+    assert merged == [5, 10, 20, 30, 40, 50]
+
+if __name__ == "__main__":
+    test_bus_arbitration()
+    test_roles()
+    test_tx_retries()
+    test_next_frame_merge()
@@ -0,0 +1,94 @@
+from fakes import deliver, fake_controller, fake_radio, install
+install()
+from rx_ring import RxRing
+
+def test_rx_ring():
+    ring = RxRing(slots=2, slot_size=8)
+    slots = list(ring.slots)
+
+    for n in range(3):
+        index = ring.acquire()
+        if n == 2:
+            # Lleno: el tercer paquete se descarta
+            assert index == -1
+            break
+        ring.slots[index][:3] = bytes([n, n, n])
+        ring.publish(index, 3, 100 + n, 1000 + n)
+
+    assert len(ring) == 2 and ring.dropped == 1
+
+    received = []
+    index = ring.borrow()
+    while index >= 0:
+        received.append((bytes(ring.frame(index)), ring.rssi[index], ring.timestamps[index]))
+        ring.release()
+        index = ring.borrow()
+
+    print("Recibidos:", received)
+    assert received == [(b'\x00\x00\x00', 100, 1000), (b'\x01\x01\x01', 101, 1001)]
+    # Los slots se reutilizan, nunca se crean nuevos
+    assert all(a is b for a, b in zip(slots, ring.slots))
+
+def test_rx_ring_reads_packet_length():
+    radio = fake_radio()
+    ring = RxRing(slots=2)
+    slot = ring.slots[0]
+    radio.spi.registers[radio.REG_RECEIVED_LENGTH] = 5
+    radio.spi.rx_fifo = bytearray(b'HELLO' + b'\xAA' * 10)
+    assert ring.receive(radio, 0)
+    # Se leen solo los 5 bytes del paquete, directo sobre el slot preasignado
+    assert bytes(ring.frame(ring.borrow())) == b'HELLO'
+    assert ring.slots[0] is slot and slot[5:] == bytes(len(slot) - 5)
+    assert radio.spi.rx_fifo == b'\xAA' * 10
+
+def test_receive_irq():
+    controller = fake_controller(int_pin=20)
+    radio = controller.radio
+    controller.enable_receive_irq()
+    handler = radio.int_pin.handler
+    assert handler is not None
+
+    # Sin IRQ no se toca el SPI
+    radio.spi.writes.clear()
+    radio.spi.registers[radio.REG_INT_STATUS1] = radio.INT_PKVALID >> 8
+    controller.service_receive(5)
+    assert radio.spi.writes == [] and len(controller.rx_ring) == 0
+
+    # La IRQ solo marca; el paquete se lee desde service_receive()
+    radio.int_pin.value(0)
+    handler(radio.int_pin)
+    assert controller.rx_pending and len(controller.rx_ring) == 0
+    radio.spi.registers[radio.REG_RECEIVED_LENGTH] = 3
+    radio.spi.rx_fifo = bytearray(b'abc')
+    controller.service_receive(5)
+    assert not controller.rx_pending
+    # El paquete se procesó (y se descartó por inválido) dentro de la ventana
+    assert len(controller.rx_ring) == 0 and controller.rx_invalid == 1
+
+class FramePublisher:
+    """Reemplazo del servidor KISS que guarda las tramas publicadas."""
+
+    def __init__(self):
+        self.frames = []
+
+    def publish(self, frame):
+        self.frames.append(frame)
+
+def test_receive_burst_longer_than_ring():
+    controller = fake_controller()
+    publisher = FramePublisher()
+    controller.set_kiss_server(publisher)
+    ax25 = controller.ax25
+    burst = [ax25.hdlc_encode(ax25.AX25Struct("SOURCE", 0, "DEST", 0, 0x03, 0xF0, bytes([n]), True).encode())
+             for n in range(2 * controller.rx_ring.size)]
+    deliver(controller.radio, burst)
+    # Toda la ráfaga llega en una sola ventana, más tramas que slots tiene el anillo
+    controller.service_receive(5)
+    assert len(publisher.frames) == 2 * controller.rx_ring.size
+    assert controller.rx_ring.dropped == 0 and controller.rx_invalid == 0
+
+if __name__ == "__main__":
+    test_rx_ring()
+    test_rx_ring_reads_packet_length()
+    test_receive_irq()
+    test_receive_burst_longer_than_ring()
@@ -0,0 +1,79 @@
+import os
+from ticket_log import TicketLog, TicketLogReader, HEADER_SIZE, DATA_OFFSET, RECORD_SIZE
+
+LOG_PATH = "test_tickets.log"
+
+def make_ticket(n):
+    return bytes([n & 0xFF]) * 16
+
+def test_ticket_log_ring():
+    if LOG_PATH in os.listdir():
+        os.remove(LOG_PATH)
+
+    log = TicketLog(LOG_PATH, capacity=8)
+    for n in range(10):
+        log.append(make_ticket(n))
+
+    # Lleno: los dos más viejos se descartaron
+    assert len(log) == 8
+    batch = log.read_batch(5)
+    assert batch == [make_ticket(n) for n in range(2, 7)]
+    log.commit(3)
+    log.close()
+
+    # Reabrir: los 3 confirmados ya no están, los 2 leídos sin confirmar vuelven
+    log = TicketLog(LOG_PATH)
+    assert log.read_batch(100) == [make_ticket(n) for n in range(5, 10)]
+    log.close()
+    os.remove(LOG_PATH)
+
+def test_ticket_log_power_loss():
+    if LOG_PATH in os.listdir():
+        os.remove(LOG_PATH)
+
+    log = TicketLog(LOG_PATH, capacity=8)
+    log.append(make_ticket(1))
+    log.append(make_ticket(2))
+    log.append(make_ticket(3))
+    # Corte de energía: el header no se actualizó y la copia más nueva quedó corrupta
+    log.file.seek((log.generation & 0x01) * HEADER_SIZE)
+    log.file.write(b'\x00' * 4)
+    log.file.close()
+
+    log = TicketLog(LOG_PATH)
+    assert log.read_batch(8) == [make_ticket(1), make_ticket(2), make_ticket(3)]
+    log.close()
+
+    reader = TicketLogReader(LOG_PATH)
+    print("Tickets en el log:", [seq for seq, _ in reader])
+    assert [ticket for _, ticket in reader] == [make_ticket(1), make_ticket(2), make_ticket(3)]
+    reader.close()
+    os.remove(LOG_PATH)
+
+def test_ticket_log_corrupt_record():
+    if LOG_PATH in os.listdir():
+        os.remove(LOG_PATH)
+
+    log = TicketLog(LOG_PATH, capacity=8)
+    for n in range(5):
+        log.append(make_ticket(n))
+    # El registro 3 queda corrupto y read_batch lo saltea
+    log.file.seek(DATA_OFFSET + 3 * RECORD_SIZE)
+    log.file.write(b'\x00' * 4)
+    assert log.read_batch(5) == [make_ticket(n) for n in (0, 1, 2, 4)]
+
+    # Solo se envió el primero: el tail no puede pasar al 1 ni al 2
+    log.commit(1)
+    assert log.tail == 1
+    # Enviados el 1 y el 2: el tail pasa también sobre el corrupto, pero no sobre el 4
+    log.commit(2)
+    assert log.tail == 4
+    log.commit(1)
+    assert log.tail == 5 and log.skipped == []
+    log.close()
+    os.remove(LOG_PATH)
+
+if __name__ == "__main__":
+    test_ticket_log_ring()
+    test_ticket_log_power_loss()
+    test_ticket_log_corrupt_record()
@@ -0,0 +1,104 @@
+import contextlib
+import io
+import os
+from fakes import fake_controller, install
+install()
+from main import RadioController
+from ticket_log import TicketLog
+
+LOG_PATH = "test_tx_queue.log"
+RETRIES = RadioController.MAX_TX_RETRIES
+
+def make_controller(results):
+    """Controlador cuyo radio devuelve los resultados de transmit_packet en orden."""
+    sent = []
+
+    def transmit_packet(data):
+        ok = results.pop(0) if results else True
+        if ok:
+            sent.append(bytes(data))
+        return ok
+
+    return fake_controller(transmit=transmit_packet), sent
+
+def frame(controller, payload):
+    return controller.ax25.AX25Struct("SRCAD", 0, "DESTAD", 0, 0x03, 0xF0, payload, True).encode()
+
+def test_queue_limits():
+    controller, _ = make_controller([])
+    # Una trama que no entra en la FIFO se rechaza al encolarla
+    assert controller.queue_frame(frame(controller, b'\x00' * 48)) is None
+    for n in range(controller.MAX_TX_QUEUE):
+        assert controller.queue_frame(frame(controller, bytes([n]))) is not None
+    assert controller.queue_frame(frame(controller, b'\x00')) is None
+    assert controller.tx_metrics['rejected'] == 2
+
+def test_retry_limit():
+    controller, sent = make_controller([False] * RETRIES)
+    first = controller.queue_frame(frame(controller, b'A'))
+    second = controller.queue_frame(frame(controller, b'B'))
+    for _ in range(RETRIES - 1):
+        assert controller.process_tx_queue() == 0
+        assert controller.tx_queue[0] is first
+    # Agotados los reintentos se descarta y sigue la próxima en la siguiente llamada
+    assert controller.process_tx_queue() == 0
+    assert controller.tx_metrics['dropped'] == 1
+    assert controller.process_tx_queue() == 1
+    assert not first.sent and second.sent and len(sent) == 1
+
+def make_log():
+    if LOG_PATH in os.listdir():
+        os.remove(LOG_PATH)
+    log = TicketLog(LOG_PATH, capacity=16)
+    for n in range(3):
+        log.append(bytes([n]) * 16)
+    return log
+
+def test_log_frames_rewind():
+    controller, sent = make_controller([True] + [False] * RETRIES)
+    log = make_log()
+    controller.set_ticket_log(log)
+
+    for _ in range(RETRIES):
+        controller.drain_ticket_log(batch_size=3)
+    # El primer ticket se confirmó; los otros dos vuelven a leerse del log
+    assert len(sent) == 1 and controller.tx_queue == []
+    assert log.pending() == 2
+    assert controller.drain_ticket_log(batch_size=3) == 2
+    assert log.pending() == 0
+    log.close()
+    os.remove(LOG_PATH)
+
+def test_drain_splits_large_frames():
+    controller, sent = make_controller([])
+    log = make_log()
+    controller.set_ticket_log(log)
+    # Tres tickets por trama no entran en la FIFO: se envían de a uno
+    assert controller.drain_ticket_log(batch_size=1, tickets_per_frame=3) == 3
+    assert log.pending() == 0 and controller.tx_metrics['rejected'] == 0
+    log.close()
+    os.remove(LOG_PATH)
+
+def send_ticket_output(controller):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        controller.send_ticket(1, 2, 3, 1234, "Test", "010923", "120000")
+    return output.getvalue()
+
+def test_send_ticket_reports_own_frame():
+    # Falla la trama anterior de la cola: el ticket no llega a enviarse
+    controller, _ = make_controller([False, True])
+    controller.queue_frame(frame(controller, b'A'))
+    assert "Error al enviar" in send_ticket_output(controller)
+    assert "Paquete enviado" in send_ticket_output(controller)
+    # Con la cola llena el ticket ni siquiera se encola
+    for n in range(controller.MAX_TX_QUEUE):
+        controller.queue_frame(frame(controller, bytes([n])))
+    assert "no se encoló" in send_ticket_output(controller)
+
+if __name__ == "__main__":
+    test_queue_limits()
+    test_retry_limit()
+    test_log_frames_rewind()
+    test_drain_splits_large_frames()
+    test_send_ticket_reports_own_frame()
@@ -0,0 +1,255 @@
+## Log persistente de tickets en flash (store-and-forward) ##
+# Archivo de registros fijos organizado como anillo:
+#   0   - header A (32 bytes)
+#   32  - header B (32 bytes)
+#   64  - registros de 24 bytes: seq (4) + ticket (16) + CRC32 (4)
+#
+# Header: magic, versión, tamaño de registro, capacidad, generación, head,
+# tail y CRC32. Se escribe alternando entre A y B, así un corte de energía
+# durante la escritura deja siempre una copia válida (la de mayor generación).
+# head es el próximo número de secuencia a escribir y tail el ticket más viejo
+# sin enviar; el registro con secuencia seq vive en el slot seq % capacidad.
+#
+# Los registros se escriben sin actualizar el header: al abrir, se recorren los
+# slots desde head mientras la secuencia y el CRC coincidan, así que los tickets
+# agregados después del último header se recuperan igual.
+#
+# Todos los enteros son big-endian, el mismo formato se lee en el host con mmap.
+
+try:
+    import ustruct as struct
+except ImportError:
+    import struct
+import binascii
+
+MAGIC = b'TLOG'
+VERSION = 1
+TICKET_SIZE = 16
+HEADER_FORMAT = '>4sHHHHIII'  # magic, version, record_size, capacity, reserved, generation, head, tail
+HEADER_SIZE = 32
+RECORD_FORMAT = '>I16s'  # seq, ticket
+RECORD_SIZE = 24
+DATA_OFFSET = 2 * HEADER_SIZE
+
+
+def _crc32(data):
+    return binascii.crc32(data) & 0xFFFFFFFF
+
+
+def pack_header(capacity, generation, head, tail):
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_SIZE, capacity, 0, generation, head, tail)
+    header += struct.pack('>I', _crc32(header))
+    return header + b'\x00' * (HEADER_SIZE - len(header))
+
+
+def unpack_header(buf, offset=0):
+    """Devuelve (capacity, generation, head, tail) o None si el header es inválido."""
+    size = struct.calcsize(HEADER_FORMAT)
+    header = bytes(buf[offset:offset + size])
+    crc = bytes(buf[offset + size:offset + size + 4])
+    if len(header) < size or len(crc) < 4 or struct.unpack('>I', crc)[0] != _crc32(header):
+        return None
+    magic, version, record_size, capacity, _, generation, head, tail = struct.unpack(HEADER_FORMAT, header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+        return None
+    return capacity, generation, head, tail
+
+
+def pack_record(seq, ticket):
+    record = struct.pack(RECORD_FORMAT, seq, ticket)
+    return record + struct.pack('>I', _crc32(record))
+
+
+def unpack_record(buf, offset, seq):
+    """Devuelve el ticket del registro si su secuencia y CRC son válidos, o None."""
+    record = bytes(buf[offset:offset + RECORD_SIZE - 4])
+    crc = bytes(buf[offset + RECORD_SIZE - 4:offset + RECORD_SIZE])
+    if len(crc) < 4 or struct.unpack('>I', crc)[0] != _crc32(record):
+        return None
+    record_seq, ticket = struct.unpack(RECORD_FORMAT, record)
+    if record_seq != seq:
+        return None
+    return ticket
+
+
+def load_header(buf):
+    """Devuelve el header válido de mayor generación como (capacity, generation, head, tail)."""
+    best = None
+    for offset in (0, HEADER_SIZE):
+        state = unpack_header(buf, offset)
+        if state is not None and (best is None or state[1] > best[1]):
+            best = state
+    return best
+
+
+class TicketLog:
+    """Anillo de tickets en flash que sobrevive cortes de energía."""
+
+    def __init__(self, path, capacity=1024):
+        self.path = path
+        try:
+            self.file = open(path, 'r+b')
+        except OSError:
+            self.file = None
+
+        state = None
+        if self.file is not None:
+            state = self._recover()
+        if state is None:
+            self._create(capacity)
+        else:
+            self.capacity, self.generation, self.head, self.tail = state
+            self._write_header()
+
+        self.cursor = self.tail  # Próximo ticket a leer para transmitir
+        self.skipped = []  # Secuencias de registros corruptos salteados por read_batch
+
+    def _create(self, capacity):
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.path, 'w+b')
+        self.capacity = capacity
+        self.generation = 0
+        self.head = 0
+        self.tail = 0
+        self._write_header()
+        self._write_header()
+        # Reservar todos los registros para no cambiar el tamaño del archivo después
+        self.file.seek(DATA_OFFSET)
+        blank = b'\xFF' * RECORD_SIZE
+        for _ in range(capacity):
+            self.file.write(blank)
+        self.file.flush()
+
+    def _recover(self):
+        state = load_header(self.file.read(DATA_OFFSET))
+        if state is None:
+            return None
+
+        capacity, generation, head, tail = state
+        # Recuperar los registros escritos después del último header
+        while self._read_record(head % capacity, head) is not None:
+            head += 1
+        if head - tail > capacity:
+            tail = head - capacity
+        return capacity, generation, head, tail
+
+    def _read_record(self, slot, seq):
+        self.file.seek(DATA_OFFSET + slot * RECORD_SIZE)
+        return unpack_record(self.file.read(RECORD_SIZE), 0, seq)
+
+    def _write_header(self):
+        self.generation += 1
+        self.file.seek((self.generation & 0x01) * HEADER_SIZE)
+        self.file.write(pack_header(self.capacity, self.generation, self.head, self.tail))
+        self.file.flush()
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def pending(self):
+        """Cantidad de tickets todavía no leídos para transmitir."""
+        return self.head - self.cursor
+
+    def append(self, ticket):
+        """Agrega un ticket de 16 bytes; si el log está lleno se descarta el más viejo."""
+        if len(ticket) != TICKET_SIZE:
+            raise ValueError("Ticket must be 16 bytes")
+
+        self.file.seek(DATA_OFFSET + (self.head % self.capacity) * RECORD_SIZE)
+        self.file.write(pack_record(self.head, bytes(ticket)))
+        self.file.flush()
+        self.head += 1
+
+        if self.head - self.tail > self.capacity:
+            self.tail = self.head - self.capacity
+            self.cursor = max(self.cursor, self.tail)
+            self._write_header()
+
+    def read_batch(self, count):
+        """Lee hasta count tickets consecutivos desde el cursor con lecturas secuenciales."""
+        count = min(count, self.head - self.cursor)
+        tickets = []
+        while count > 0:
+            slot = self.cursor % self.capacity
+            run = min(count, self.capacity - slot)  # Hasta el final del anillo
+            self.file.seek(DATA_OFFSET + slot * RECORD_SIZE)
+            block = self.file.read(run * RECORD_SIZE)
+            for i in range(run):
+                ticket = unpack_record(block, i * RECORD_SIZE, self.cursor)
+                if ticket is None:
+                    # Registro corrupto: se saltea
+                    self.skipped.append(self.cursor)
+                    self.cursor += 1
+                    continue
+                tickets.append(ticket)
+                self.cursor += 1
+            count -= run
+        return tickets
+
+    def commit(self, count):
+        """Marca como enviados los count tickets más viejos y persiste el header.
+
+        El tail solo avanza sobre los registros consecutivos desde el tail que
+        fueron enviados o salteados por corruptos, nunca sobre uno leído y sin enviar.
+        """
+        tail = self.tail
+        skipped = [seq for seq in self.skipped if seq >= tail]
+        while tail < self.cursor:
+            if tail in skipped:
+                skipped.remove(tail)
+            elif count > 0:
+                count -= 1
+            else:
+                break
+            tail += 1
+        self.skipped = skipped
+        if tail != self.tail:
+            self.tail = tail
+            self._write_header()
+
+    def rewind(self):
+        """Vuelve el cursor al ticket más viejo sin confirmar."""
+        self.cursor = self.tail
+        self.skipped = []
+
+    def close(self):
+        self._write_header()
+        self.file.close()
+
+
+class TicketLogReader:
+    """Lectura del log en el host a través de mmap (solo CPython)."""
+
+    def __init__(self, path):
+        import mmap
+
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        state = load_header(self.map)
+        if state is None:
+            raise ValueError("Invalid ticket log")
+        self.capacity, self.generation, self.head, self.tail = state
+
+        # Recuperar los registros escritos después del último header
+        while self._ticket(self.head) is not None:
+            self.head += 1
+        if self.head - self.tail > self.capacity:
+            self.tail = self.head - self.capacity
+
+    def _ticket(self, seq):
+        return unpack_record(self.map, DATA_OFFSET + (seq % self.capacity) * RECORD_SIZE, seq)
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def __iter__(self):
+        """Recorre (seq, ticket) desde el más viejo sin enviar hasta el más nuevo."""
+        for seq in range(self.tail, self.head):
+            ticket = self._ticket(seq)
+            if ticket is not None:
+                yield seq, ticket
+
+    def close(self):
+        self.map.close()
+        self.file.close()